@@ -11,7 +11,7 @@ class Classifier(Protocol):
     def classify(self, image_bytes: bytes) -> "Classification": ...
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Classification:
     state: str
     score: float
@@ -1,44 +1,72 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import replace
+from itertools import islice
+from datetime import datetime
 from pathlib import Path
 from threading import Lock
-from typing import List, Optional
+from typing import Callable, Deque, List, Optional, Set
 
 from ..datalake.storage import CaptureRecord
-from ..web.capture_utils import CaptureSummary, load_capture_summary
+from ..web.capture_utils import (
+    CaptureSummary,
+    iter_capture_days,
+    load_capture_summary,
+    scan_capture_day,
+)
 
 
 class RecentCaptureIndex:
-    """Maintain an in-memory list of the most recent capture summaries."""
-
-    def __init__(self, root: Path, max_items: int = 500) -> None:
+    """Maintain an in-memory ring of the most recent capture summaries.
+
+    The ring always holds a contiguous window of the newest captures stored
+    through this process, so any query it can fully answer from memory needs
+    no disk walk. Entries handed out are checked against the disk first:
+    captures whose metadata was deleted are dropped (and the caller falls
+    back to the partition scan), and images removed by the pruner are
+    reported as unavailable. Captures written into the datalake by another
+    process only appear once the ring can no longer answer a query.
+
+    ``is_pending`` reports files still queued by an asynchronous datalake,
+    which count as present.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_items: int = 500,
+        *,
+        is_pending: Callable[[Path], bool] | None = None,
+    ) -> None:
         self._root = root
         self._max_items = max_items
+        self._is_pending = is_pending
         self._lock = Lock()
-        self._entries: List[CaptureSummary] = []
+        self._entries: Deque[CaptureSummary] = deque(maxlen=max_items)
         self._by_id: dict[str, CaptureSummary] = {}
+        self._json_paths: dict[str, Path] = {}
         self._load_initial()
 
     def _load_initial(self) -> None:
         if not self._root.exists():
             return
 
-        json_paths = sorted(
-            self._root.glob("**/*.json"),
-            key=lambda path: path.stat().st_mtime,
-            reverse=True,
-        )[: self._max_items]
-
-        for path in json_paths:
-            summary = load_capture_summary(path)
-            if summary is None:
-                continue
-            self._entries.append(summary)
-            self._by_id[summary.record_id] = summary
+        # Only the newest day partitions are read, not the whole datalake
+        for day_dir in iter_capture_days(self._root):
+            json_names, file_names = scan_capture_day(day_dir)
+            for name in json_names:
+                if len(self._entries) >= self._max_items:
+                    return
+                summary = load_capture_summary(day_dir / name, file_names)
+                if summary is None:
+                    continue
+                self._entries.append(summary)
+                self._by_id[summary.record_id] = summary
+                self._json_paths[summary.record_id] = day_dir / name
 
     def add_record(self, record: CaptureRecord) -> None:
-        image_path = record.image_path if record.image_path.exists() else None
+        image_path = record.image_path if record.image_stored else None
         image_available = image_path is not None
         summary = CaptureSummary(
             record_id=record.record_id,
@@ -52,23 +80,88 @@ class RecentCaptureIndex:
             image_path=image_path,
             image_available=image_available,
             captured_at_dt=record.captured_at,
-            ingested_at_dt=record.ingested_at,
         )
         with self._lock:
-            self._entries.insert(0, summary)
+            if len(self._entries) == self._max_items:
+                evicted = self._entries.pop()
+                self._by_id.pop(evicted.record_id, None)
+                self._json_paths.pop(evicted.record_id, None)
+            self._entries.appendleft(summary)
             self._by_id[summary.record_id] = summary
-            if len(self._entries) > self._max_items:
-                removed = self._entries[self._max_items :]
-                del self._entries[self._max_items :]
-                for item in removed:
-                    self._by_id.pop(item.record_id, None)
+            self._json_paths[summary.record_id] = record.metadata_path
 
     def latest(self, limit: int) -> List[CaptureSummary]:
         if limit <= 0:
             return []
         with self._lock:
-            window = self._entries[:limit]
-        return [replace(entry) for entry in window]
+            window = list(islice(self._entries, limit))
+        return self._verified(window)
+
+    def matching(
+        self,
+        limit: int,
+        *,
+        states: Set[str] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> List[CaptureSummary] | None:
+        """Return the newest ``limit`` summaries passing the filters.
+
+        Returns ``None`` when the ring holds fewer than ``limit`` matches, in
+        which case older captures on disk may still qualify.
+        """
+        if limit <= 0:
+            return []
+        matches: List[CaptureSummary] = []
+        with self._lock:
+            for entry in self._entries:
+                if states is not None and entry.state not in states:
+                    continue
+                captured_at_dt = entry.captured_at_dt
+                if start is not None and (captured_at_dt is None or captured_at_dt < start):
+                    continue
+                if end is not None and (captured_at_dt is None or captured_at_dt > end):
+                    continue
+                matches.append(entry)
+                if len(matches) >= limit:
+                    break
+        if len(matches) < limit:
+            return None
+        verified = self._verified(matches)
+        # Dropped entries leave the window short; older captures on disk may
+        # fill it
+        return verified if len(verified) == limit else None
+
+    def discard(self, record_id: str) -> None:
+        with self._lock:
+            if self._by_id.pop(record_id, None) is None:
+                return
+            self._json_paths.pop(record_id, None)
+            self._entries = deque(
+                (entry for entry in self._entries if entry.record_id != record_id),
+                maxlen=self._max_items,
+            )
+
+    def _verified(self, entries: List[CaptureSummary]) -> List[CaptureSummary]:
+        """Copy ``entries``, dropping deleted captures and marking pruned images."""
+        verified: List[CaptureSummary] = []
+        for entry in entries:
+            json_path = self._json_paths.get(entry.record_id)
+            if json_path is not None and not self._on_disk(json_path):
+                self.discard(entry.record_id)
+                continue
+            if entry.image_path is not None and not self._on_disk(entry.image_path):
+                verified.append(replace(entry, image_path=None, image_available=False))
+            else:
+                verified.append(replace(entry))
+        return verified
+
+    def _on_disk(self, path: Path) -> bool:
+        # Pending is checked first: a write landing between the two checks is
+        # then still seen on disk
+        if self._is_pending is not None and self._is_pending(path):
+            return True
+        return path.exists()
 
     def get(self, record_id: str) -> CaptureSummary | None:
         with self._lock:
@@ -24,6 +24,8 @@ class ServerConfig:
 class StorageConfig:
     """Storage paths configuration."""
     datalake_root: str = "/mnt/data/datalake"
+    async_writes: bool = False
+    write_queue_size: int = 64
 
 
 @dataclass
@@ -253,7 +255,9 @@ def create_example_config() -> dict[str, Any]:
             "port": 8000
         },
         "storage": {
-            "datalake_root": "/mnt/data/datalake"
+            "datalake_root": "/mnt/data/datalake",
+            "async_writes": False,
+            "write_queue_size": 64
         },
         "classifier": {
             "backend": "openai",
@@ -8,13 +8,14 @@ pruned to ensure important alert data is retained.
 
 from __future__ import annotations
 
-import json
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,8 +66,7 @@ def prune_datalake(
 
         try:
             # Read metadata
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = orjson.loads(json_path.read_bytes())
 
             # Extract classification state and capture time
             classification = data.get("classification", {})
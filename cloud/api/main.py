@@ -312,6 +312,8 @@ def main() -> None:
         streak_keep_every=cfg.features.streak_pruning.keep_every,
         timing_debug_enabled=timing_debug_enabled,
         timing_debug_max_captures=cfg.features.timing_debug.max_captures,
+        datalake_async_writes=cfg.storage.async_writes,
+        datalake_write_queue_size=cfg.storage.write_queue_size,
     )
 
     # Start uvicorn server
@@ -419,7 +421,11 @@ def main() -> None:
                         logger.error(f"Periodic pruning failed: {exc}")
 
         async def _periodic_cache_flush() -> None:
-            """Flush similarity cache periodically to persist updates."""
+            """Prune and flush the similarity cache periodically.
+
+            Expired entries are skipped at lookup time, so pruning only needs
+            to keep the cache small and runs here instead of per capture.
+            """
             # Flush every 10 seconds if similarity is enabled
             flush_interval = 10.0
 
@@ -434,6 +440,9 @@ def main() -> None:
                         if similarity_cache:
                             service = app.state.service
                             if service.similarity_cache:
+                                service.similarity_cache.prune_expired(
+                                    service.similarity_expiry_minutes
+                                )
                                 service.similarity_cache.flush()
                                 logger.debug("Similarity cache flushed to disk")
                     except Exception as exc:
@@ -90,9 +90,13 @@ def load_notification_settings(path: Path | None) -> NotificationSettings:
 
 
 def save_notification_settings(path: Path, settings: NotificationSettings) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
     serialized = settings.sanitized().to_dict()
-    path.write_text(json.dumps(serialized, indent=2, sort_keys=True), encoding="utf-8")
+    content = json.dumps(serialized, indent=2, sort_keys=True)
+    try:
+        path.write_text(content, encoding="utf-8")
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
 
 
 __all__ = [
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
 from dataclasses import dataclass
@@ -9,7 +10,7 @@ from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
 from .schemas import (
     CaptureRequest,
@@ -185,10 +186,18 @@ def create_app(
     streak_keep_every: int = 1,
     timing_debug_enabled: bool = False,
     timing_debug_max_captures: int = 100,
+    datalake_async_writes: bool = False,
+    datalake_write_queue_size: int = 64,
 ) -> FastAPI:
     root = root_dir or Path("/mnt/data/datalake")
-    datalake = FileSystemDatalake(root=root)
-    capture_index = RecentCaptureIndex(root=datalake.root)
+    datalake = FileSystemDatalake(
+        root=root,
+        async_writes=datalake_async_writes,
+        write_queue_size=datalake_write_queue_size,
+    )
+    capture_index = RecentCaptureIndex(
+        root=datalake.root, is_pending=datalake.is_pending
+    )
     selected_classifier = classifier or SimpleThresholdModel()
     similarity_cache = (
         SimilarityCache(Path(similarity_cache_path))
@@ -410,7 +419,7 @@ def create_app(
     @app.get("/v1/device-config", response_model=DeviceConfigResponse)
     def fetch_device_config(
         request: Request, device_id_override: Optional[str] = None
-    ) -> DeviceConfigResponse:
+    ) -> Response:
         _record_device_presence(request)
         config: TriggerConfig = app.state.trigger_config
         normal = getattr(app.state, "normal_description", "")
@@ -421,7 +430,7 @@ def create_app(
             config.enabled,
             config.interval_seconds,
         )
-        return DeviceConfigResponse(
+        payload = DeviceConfigResponse(
             device_id=target_id,
             trigger=TriggerConfigModel(
                 enabled=config.enabled,
@@ -431,6 +440,14 @@ def create_app(
             normal_description_file=getattr(app.state, "normal_description_file", None),
             manual_trigger_counter=app.state.manual_trigger_counter,
         )
+        # Devices poll this every half second and the config rarely changes,
+        # so an ETag lets unchanged polls end in an empty 304
+        body = payload.model_dump_json().encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
 
     @app.post("/v1/manual-trigger", response_model=dict[str, int])
     async def manual_trigger(
@@ -683,6 +700,7 @@ def create_app(
             shutdown_event.set()
         await trigger_hub.close()
         await capture_hub.close()
+        await asyncio.to_thread(datalake.close)
 
     register_ui(app)
 
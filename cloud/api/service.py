@@ -3,6 +3,7 @@ from __future__ import annotations
 import base64
 import logging
 import io
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from typing import Any, Dict
@@ -19,12 +20,15 @@ from ..ai.types import Classification
 from ..datalake.storage import FileSystemDatalake, CaptureRecord
 from .capture_index import RecentCaptureIndex
 from .email_service import AbnormalCaptureNotifier
-from .similarity_cache import CachedEvaluation, SimilarityCache
+from .similarity_cache import CachedEvaluation, SimilarityCache, hamming_distances
 from .timing_debug import CaptureTimings
 
 
 logger = logging.getLogger(__name__)
 
+# Maps the 0/1 flag bytes of a thumbnail hash onto ASCII binary digits
+_BIT_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
 
 @dataclass
 class _DedupeEntry:
@@ -97,7 +101,7 @@ class InferenceService:
         if timing:
             timing.t4_server_decode_complete = time.time()
 
-        device_key = self._device_key({"device_id": payload.get("device_id")})
+        device_key = self._device_key(payload.get("device_id"))
 
         logger.info(
             "Running inference device=%s trigger=%s image_bytes=%d",
@@ -109,7 +113,7 @@ class InferenceService:
         similarity_hash: str | None = None
         reused_entry: CachedEvaluation | None = None
         reuse_distance: int | None = None
-        if self.similarity_enabled:
+        if self.similarity_enabled and self._similarity_hash_useful(device_key):
             similarity_hash = self._compute_similarity_hash(image_bytes)
             # Timing debug: Record similarity hash complete
             if timing:
@@ -155,6 +159,7 @@ class InferenceService:
                 classification.score,
             )
 
+        state_label = sys.intern(str(classification.state or "").strip().lower())
         ingested_at = datetime.now(timezone.utc)
         device_captured_at = self._parse_device_timestamp(payload.get("captured_at"))
         if device_captured_at is None:
@@ -167,16 +172,6 @@ class InferenceService:
         }
         metadata.setdefault("device_captured_at", device_captured_at.isoformat())
         metadata.setdefault("ingested_at", ingested_at.isoformat())
-        classification_payload = {
-            "state": classification.state,
-            "score": classification.score,
-            "reason": classification.reason,
-        }
-        # Include agent details if available (from consensus classifier)
-        if classification.agent_details is not None:
-            classification_payload["agent_details"] = classification.agent_details
-        device_key = self._device_key(metadata)
-        state_label = str(classification.state or "").strip().lower()
         streak_store_image = True
         if self.streak_pruning_enabled or self.similarity_enabled:
             streak_store_image = self._should_store_image(device_key, state_label)
@@ -203,12 +198,14 @@ class InferenceService:
                 image_bytes=image_bytes if streak_store_image else None,
                 thumbnail_bytes=thumbnail_bytes,  # Always store thumbnail if available
                 metadata=metadata,
-                classification=classification_payload,
+                classification=_classification_payload(classification),
                 normal_description_file=self.normal_description_file,
                 store_image=streak_store_image,
                 captured_at=device_captured_at,
                 ingested_at=ingested_at,
                 device_id=metadata.get("device_id"),
+                # Abnormal alerts attach the stored image, so it must be on disk
+                wait=state_label == "abnormal" and self.notifier is not None,
             )
             # Timing debug: Record storage complete
             if timing:
@@ -243,8 +240,6 @@ class InferenceService:
                 dedupe_entry.count,
             )
 
-        device_key = self._device_key(metadata)
-        state_label = str(classification.state or "").strip().lower()
         if state_label == "normal":
             self._last_abnormal_sent.pop(device_key, None)
         elif state_label == "abnormal" and self.notifier is not None:
@@ -289,18 +284,19 @@ class InferenceService:
                     device_id=device_key,
                     record_id=cache_record_id,
                     hash_hex=similarity_hash,
-                    state=classification_payload["state"],
-                    score=classification_payload["score"],
-                    reason=classification_payload["reason"],
+                    state=classification.state,
+                    score=classification.score,
+                    reason=classification.reason,
                     captured_at=captured_at_dt,
                 )
 
-        return {
+        response: Dict[str, Any] = {
             "record_id": record_id_for_response or "",
-            **classification_payload,
-            "captured_at": captured_at_dt.isoformat() if captured_at_dt else None,
-            "created": new_record_created,
+            **_classification_payload(classification),
         }
+        response["captured_at"] = captured_at_dt.isoformat() if captured_at_dt else None
+        response["created"] = new_record_created
+        return response
 
     def update_alert_cooldown(self, minutes: float) -> None:
         sanitized = max(0.0, float(minutes or 0.0))
@@ -360,8 +356,8 @@ class InferenceService:
     ) -> tuple[CachedEvaluation | None, int | None]:
         if not self.similarity_enabled or self.similarity_cache is None:
             return None, None
-        self.similarity_cache.prune_expired(self.similarity_expiry_minutes)
 
+        required_state: str | None = None
         # When streak pruning is enabled, only reuse after reaching threshold
         if self.streak_pruning_enabled and self.streak_threshold > 0:
             streak_entry = self._streak_tracker.get(device_key)
@@ -371,23 +367,50 @@ class InferenceService:
                 or streak_entry.count < self.streak_threshold
             ):
                 return None, None
-            # Validate that cached state matches current streak state
-            cache_entry = self.similarity_cache.get(device_key)
-            if cache_entry is None:
-                return None, None
-            if cache_entry.state != streak_entry.state:
-                return None, None
-        else:
-            # When streak pruning is disabled, allow immediate reuse
-            cache_entry = self.similarity_cache.get(device_key)
-            if cache_entry is None:
-                return None, None
-        if cache_entry.is_expired(self.similarity_expiry_minutes):
+            # Only reuse cached states that match the current streak state
+            required_state = streak_entry.state
+        # When streak pruning is disabled, allow immediate reuse
+        try:
+            hash_value = int(hash_hex, 16)
+        except ValueError:
             return None, None
-        distance = _hamming_distance_hex(cache_entry.hash_hex, hash_hex)
+        candidates = [
+            entry
+            for entry in self.similarity_cache.get_candidates(device_key, hash_value)
+            if (required_state is None or entry.state == required_state)
+            and not entry.is_expired(self.similarity_expiry_minutes)
+        ]
+        if not candidates:
+            return None, None
+        if len(candidates) == 1:
+            best_entry = candidates[0]
+            distance = _hamming_distance_hex(best_entry.hash_hex, hash_hex)
+        else:
+            distances = hamming_distances(
+                hash_value, [int(entry.hash_hex, 16) for entry in candidates]
+            )
+            best_index = int(distances.argmin())
+            best_entry = candidates[best_index]
+            distance = int(distances[best_index])
         if distance > max(0, self.similarity_threshold):
             return None, distance
-        return cache_entry, distance
+        return best_entry, distance
+
+    def _similarity_hash_useful(self, device_key: str) -> bool:
+        """Return False when hashing cannot lead to a reuse now or on the next capture.
+
+        The hash is needed either to match the cached entry or to refresh the
+        cache after classification. Under streak gating, a streak that cannot
+        reach the threshold with this capture makes both pointless.
+        """
+        if self.similarity_cache is None:
+            return False
+        if self.streak_pruning_enabled and self.streak_threshold > 0:
+            streak_entry = self._streak_tracker.get(device_key)
+            streak_count = streak_entry.count if streak_entry else 0
+            if streak_count + 1 < self.streak_threshold:
+                return False
+        return True
 
     def _should_store_image(self, device_key: str, state_label: str) -> bool:
         entry = self._streak_tracker.get(device_key)
@@ -431,11 +454,13 @@ class InferenceService:
             return True
         return False
 
-    def _device_key(self, metadata: Dict[str, Any]) -> str:
-        value = metadata.get("device_id") if isinstance(metadata, dict) else None
-        return (
-            str(value) if value is not None and str(value).strip() else "unknown-device"
-        )
+    @staticmethod
+    def _device_key(value: Any) -> str:
+        if value is None:
+            return "unknown-device"
+        text = str(value)
+        # Interned so the tracker dict lookups hit on identity
+        return sys.intern(text) if text.strip() else "unknown-device"
 
     def _parse_device_timestamp(self, value: Any) -> datetime | None:
         if value is None:
@@ -460,22 +485,34 @@ class InferenceService:
         try:
             with Image.open(io.BytesIO(image_bytes)) as img:
                 img = img.convert("L").resize((8, 8), _RESAMPLE)
-                pixels = list(img.getdata())
+                pixels = img.tobytes()
         except Exception:
             logger.debug("Failed to compute similarity hash", exc_info=True)
             return None
         if not pixels:
             return None
         avg = sum(pixels) / len(pixels)
-        bits = 0
-        for value in pixels:
-            bits = (bits << 1) | (1 if value >= avg else 0)
+        # One byte per pixel; pack the above-average flags into a big-endian int
+        flags = bytes(value >= avg for value in pixels)
+        bits = int(flags.translate(_BIT_DIGITS), 2)
         return f"{bits:016x}"
 
 
 __all__ = ["InferenceService"]
 
 
+def _classification_payload(classification: Classification) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "state": classification.state,
+        "score": classification.score,
+        "reason": classification.reason,
+    }
+    # Include agent details if available (from consensus classifier)
+    if classification.agent_details is not None:
+        payload["agent_details"] = classification.agent_details
+    return payload
+
+
 def _hamming_distance_hex(hex_a: str, hex_b: str) -> int:
     try:
         value_a = int(hex_a, 16)
@@ -5,7 +5,9 @@ import threading
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 @dataclass
@@ -32,13 +34,46 @@ class CachedEvaluation:
         return delta.total_seconds() > expiry_minutes * 60
 
 
+def hamming_distances(hash_value: int, candidates: Sequence[int]) -> np.ndarray:
+    """Return the bit distance between ``hash_value`` and each 64-bit candidate.
+
+    Single comparisons are cheaper with ``int.bit_count``; this is meant for
+    scanning many cached hashes at once.
+    """
+    if len(candidates) == 0:
+        return np.zeros(0, dtype=np.int64)
+    hashes = np.asarray(candidates, dtype=np.uint64)
+    diff = np.bitwise_xor(hashes, np.uint64(hash_value))
+    bits = np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1)
+    return bits.sum(axis=1, dtype=np.int64)
+
+
+_BUCKET_SHIFT = 56
+_MAX_BUCKET_ENTRIES = 8
+# Bucket keys one flipped bit away from a hash's top byte
+_NEIGHBOR_MASKS = tuple(1 << bit for bit in range(64 - _BUCKET_SHIFT))
+
+
+def _hash_int(hash_hex: str) -> int | None:
+    try:
+        return int(hash_hex, 16)
+    except ValueError:
+        return None
+
+
 class SimilarityCache:
-    """Persistence layer for reuse of recent classifications."""
+    """Persistence layer for reuse of recent classifications.
+
+    Besides the latest entry per device, entries are indexed by
+    ``(device_id, top 8 hash bits)`` so lookups can scan several recent
+    scenes instead of only the last one.
+    """
 
     def __init__(self, path: Path | None = None) -> None:
         self._path = path
         self._lock = threading.Lock()
         self._entries: Dict[str, CachedEvaluation] = {}
+        self._buckets: Dict[Tuple[str, int], List[CachedEvaluation]] = {}
         self._dirty = False  # Track if cache needs saving
         if self._path is not None:
             self._load()
@@ -51,28 +86,34 @@ class SimilarityCache:
         except (OSError, json.JSONDecodeError):
             return
         for device_id, payload in data.items():
-            if not isinstance(payload, dict):
-                continue
-            try:
-                entry = CachedEvaluation(
-                    device_id=device_id,
-                    record_id=str(payload["record_id"]),
-                    hash_hex=str(payload["hash_hex"]),
-                    state=str(payload["state"]),
-                    score=float(payload.get("score", 0.0)),
-                    reason=payload.get("reason"),
-                    captured_at=str(payload["captured_at"]),
-                )
-            except (KeyError, ValueError, TypeError):
-                continue
-            self._entries[device_id] = entry
+            # Older cache files hold a single entry per device
+            items = payload if isinstance(payload, list) else [payload]
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    entry = CachedEvaluation(
+                        device_id=device_id,
+                        record_id=str(item["record_id"]),
+                        hash_hex=str(item["hash_hex"]),
+                        state=str(item["state"]),
+                        score=float(item.get("score", 0.0)),
+                        reason=item.get("reason"),
+                        captured_at=str(item["captured_at"]),
+                    )
+                except (KeyError, ValueError, TypeError):
+                    continue
+                self._insert(entry)
 
     def _save(self) -> None:
         if self._path is None:
             return
-        payload = {
-            device_id: asdict(entry) for device_id, entry in self._entries.items()
-        }
+        payload: Dict[str, List[Dict[str, object]]] = {}
+        for entries in self._buckets.values():
+            for entry in entries:
+                payload.setdefault(entry.device_id, []).append(asdict(entry))
+        for device_id, entries in payload.items():
+            entries.sort(key=lambda item: str(item["captured_at"]))
         try:
             self._path.parent.mkdir(parents=True, exist_ok=True)
             self._path.write_text(
@@ -82,10 +123,40 @@ class SimilarityCache:
             # Cache persistence is best-effort; ignore failures.
             pass
 
+    def _insert(self, entry: CachedEvaluation) -> None:
+        hash_value = _hash_int(entry.hash_hex)
+        if hash_value is None:
+            return
+        key = (entry.device_id, hash_value >> _BUCKET_SHIFT)
+        bucket = [
+            item for item in self._buckets.get(key, ()) if item.hash_hex != entry.hash_hex
+        ]
+        bucket.append(entry)
+        self._buckets[key] = bucket[-_MAX_BUCKET_ENTRIES:]
+        latest = self._entries.get(entry.device_id)
+        if latest is None or latest.captured_at <= entry.captured_at:
+            self._entries[entry.device_id] = entry
+
     def get(self, device_id: str) -> Optional[CachedEvaluation]:
         with self._lock:
             return self._entries.get(device_id)
 
+    def get_candidates(self, device_id: str, hash_value: int) -> List[CachedEvaluation]:
+        """Return cached entries whose hash shares or nearly shares the top byte.
+
+        The device's latest entry is always included so a lookup never does
+        worse than comparing against the previous capture.
+        """
+        top = hash_value >> _BUCKET_SHIFT
+        with self._lock:
+            candidates = list(self._buckets.get((device_id, top), ()))
+            for mask in _NEIGHBOR_MASKS:
+                candidates.extend(self._buckets.get((device_id, top ^ mask), ()))
+            latest = self._entries.get(device_id)
+        if latest is not None and all(entry is not latest for entry in candidates):
+            candidates.append(latest)
+        return candidates
+
     def update(
         self,
         *,
@@ -108,7 +179,7 @@ class SimilarityCache:
             captured_at=captured.astimezone(timezone.utc).isoformat(),
         )
         with self._lock:
-            self._entries[device_id] = entry
+            self._insert(entry)
             self._dirty = True
             # Don't save immediately - let flush() handle it periodically
 
@@ -117,6 +188,21 @@ class SimilarityCache:
             return
         now = datetime.now(timezone.utc)
         with self._lock:
+            removed = False
+            for key in list(self._buckets):
+                bucket = self._buckets[key]
+                kept = [
+                    entry
+                    for entry in bucket
+                    if not entry.is_expired(expiry_minutes, now=now)
+                ]
+                if len(kept) == len(bucket):
+                    continue
+                removed = True
+                if kept:
+                    self._buckets[key] = kept
+                else:
+                    del self._buckets[key]
             expired = [
                 device_id
                 for device_id, entry in self._entries.items()
@@ -124,7 +210,7 @@ class SimilarityCache:
             ]
             for device_id in expired:
                 self._entries.pop(device_id, None)
-            if expired:
+            if removed or expired:
                 self._dirty = True
 
     def clear(self) -> None:
@@ -135,6 +221,7 @@ class SimilarityCache:
         """
         with self._lock:
             self._entries.clear()
+            self._buckets.clear()
             self._dirty = True
             # Clear is important enough to save immediately
             self._save()
@@ -151,4 +238,4 @@ class SimilarityCache:
                 self._dirty = False
 
 
-__all__ = ["SimilarityCache", "CachedEvaluation"]
+__all__ = ["SimilarityCache", "CachedEvaluation", "hamming_distances"]
@@ -7,7 +7,9 @@ Designed to be toggled on/off for debugging without production overhead.
 from __future__ import annotations
 
 import logging
+import math
 import statistics
+from array import array
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -16,6 +18,52 @@ from typing import Any
 logger = logging.getLogger(__name__)
 
 
+# Raw timestamps recorded per capture (UTC epoch seconds), in pipeline order.
+# t0-t2 come from the device, t3-t9 from the server.
+TIMESTAMPS: tuple[str, ...] = (
+    "t0_device_capture",
+    "t1_device_thumbnail",
+    "t2_device_request_sent",
+    "t3_server_request_received",
+    "t4_server_decode_complete",
+    "t5_server_similarity_hash",
+    "t6_server_inference_complete",
+    "t7_server_storage_complete",
+    "t8_server_broadcast_complete",
+    "t9_server_response_sent",
+)
+
+# Delta names (milliseconds) and the timestamp indices they span
+STAGES: tuple[str, ...] = (
+    "device_thumbnail_ms",
+    "device_send_prep_ms",
+    "network_device_to_server_ms",
+    "server_decode_ms",
+    "server_similarity_hash_ms",
+    "server_inference_ms",
+    "server_storage_ms",
+    "server_broadcast_ms",
+    "server_response_ms",
+    "server_total_ms",
+    "e2e_device_to_response_ms",
+)
+_STAGE_BOUNDS: tuple[tuple[int, int], ...] = (
+    (0, 1),
+    (1, 2),
+    (2, 3),
+    (3, 4),
+    (4, 5),
+    (5, 6),
+    (6, 7),
+    (7, 8),
+    (8, 9),
+    (3, 9),
+    (0, 9),
+)
+
+_NAN = math.nan
+
+
 @dataclass
 class CaptureTimings:
     """Timing data for a single capture, from device to UI."""
@@ -42,69 +90,55 @@ class CaptureTimings:
     state: str | None = None
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
-    def compute_deltas(self) -> dict[str, float | None]:
-        """Compute time deltas between stages in milliseconds."""
-        deltas = {}
-
-        # Device stages
-        if self.t0_device_capture and self.t1_device_thumbnail:
-            deltas["device_thumbnail_ms"] = (self.t1_device_thumbnail - self.t0_device_capture) * 1000
-
-        if self.t1_device_thumbnail and self.t2_device_request_sent:
-            deltas["device_send_prep_ms"] = (self.t2_device_request_sent - self.t1_device_thumbnail) * 1000
-
-        # Network latency (device → server)
-        if self.t2_device_request_sent and self.t3_server_request_received:
-            deltas["network_device_to_server_ms"] = (self.t3_server_request_received - self.t2_device_request_sent) * 1000
-
-        # Server processing stages
-        if self.t3_server_request_received and self.t4_server_decode_complete:
-            deltas["server_decode_ms"] = (self.t4_server_decode_complete - self.t3_server_request_received) * 1000
-
-        if self.t4_server_decode_complete and self.t5_server_similarity_hash:
-            deltas["server_similarity_hash_ms"] = (self.t5_server_similarity_hash - self.t4_server_decode_complete) * 1000
-
-        if self.t5_server_similarity_hash and self.t6_server_inference_complete:
-            deltas["server_inference_ms"] = (self.t6_server_inference_complete - self.t5_server_similarity_hash) * 1000
-
-        if self.t6_server_inference_complete and self.t7_server_storage_complete:
-            deltas["server_storage_ms"] = (self.t7_server_storage_complete - self.t6_server_inference_complete) * 1000
-
-        if self.t7_server_storage_complete and self.t8_server_broadcast_complete:
-            deltas["server_broadcast_ms"] = (self.t8_server_broadcast_complete - self.t7_server_storage_complete) * 1000
-
-        if self.t8_server_broadcast_complete and self.t9_server_response_sent:
-            deltas["server_response_ms"] = (self.t9_server_response_sent - self.t8_server_broadcast_complete) * 1000
-
-        # Total server processing time
-        if self.t3_server_request_received and self.t9_server_response_sent:
-            deltas["server_total_ms"] = (self.t9_server_response_sent - self.t3_server_request_received) * 1000
-
-        # End-to-end (device capture → server response)
-        if self.t0_device_capture and self.t9_server_response_sent:
-            deltas["e2e_device_to_response_ms"] = (self.t9_server_response_sent - self.t0_device_capture) * 1000
+    # Deltas memoized against the timestamps they were computed from
+    _delta_cache: tuple[tuple[float | None, ...], array] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def timestamp_values(self) -> tuple[float | None, ...]:
+        """Return the timestamps in ``TIMESTAMPS`` order."""
+        return (
+            self.t0_device_capture,
+            self.t1_device_thumbnail,
+            self.t2_device_request_sent,
+            self.t3_server_request_received,
+            self.t4_server_decode_complete,
+            self.t5_server_similarity_hash,
+            self.t6_server_inference_complete,
+            self.t7_server_storage_complete,
+            self.t8_server_broadcast_complete,
+            self.t9_server_response_sent,
+        )
 
+    def delta_values(self) -> array:
+        """Return deltas in milliseconds, indexed like ``STAGES`` (NaN when missing)."""
+        ts = self.timestamp_values()
+        cached = self._delta_cache
+        if cached is not None and cached[0] == ts:
+            return cached[1]
+        deltas = array("d", [_NAN] * len(STAGES))
+        for index, (start, end) in enumerate(_STAGE_BOUNDS):
+            # Unset or zero timestamps leave the delta missing
+            if ts[start] and ts[end]:
+                deltas[index] = (ts[end] - ts[start]) * 1000
+        self._delta_cache = (ts, deltas)
         return deltas
 
+    def compute_deltas(self) -> dict[str, float | None]:
+        """Compute time deltas between stages in milliseconds."""
+        return {
+            name: value
+            for name, value in zip(STAGES, self.delta_values())
+            if not math.isnan(value)
+        }
+
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        deltas = self.compute_deltas()
         return {
             "record_id": self.record_id,
             "device_id": self.device_id,
-            "timestamps": {
-                "t0_device_capture": self.t0_device_capture,
-                "t1_device_thumbnail": self.t1_device_thumbnail,
-                "t2_device_request_sent": self.t2_device_request_sent,
-                "t3_server_request_received": self.t3_server_request_received,
-                "t4_server_decode_complete": self.t4_server_decode_complete,
-                "t5_server_similarity_hash": self.t5_server_similarity_hash,
-                "t6_server_inference_complete": self.t6_server_inference_complete,
-                "t7_server_storage_complete": self.t7_server_storage_complete,
-                "t8_server_broadcast_complete": self.t8_server_broadcast_complete,
-                "t9_server_response_sent": self.t9_server_response_sent,
-            },
-            "deltas_ms": deltas,
+            "timestamps": dict(zip(TIMESTAMPS, self.timestamp_values())),
+            "deltas_ms": self.compute_deltas(),
             "metadata": {
                 "similarity_cache_hit": self.similarity_cache_hit,
                 "state": self.state,
@@ -152,12 +186,11 @@ class TimingStats:
         total = len(self._captures)
 
         for timing in self._captures:
-            deltas = timing.compute_deltas()
             if timing.similarity_cache_hit:
                 cache_hits += 1
 
-            for key, value in deltas.items():
-                if value is not None:
+            for key, value in zip(STAGES, timing.delta_values()):
+                if not math.isnan(value):
                     all_deltas.setdefault(key, []).append(value)
 
         # Compute stats for each stage
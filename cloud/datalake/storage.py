@@ -1,12 +1,25 @@
 from __future__ import annotations
 
-import json
+import logging
+import os
+import queue
 import re
+import threading
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_UTC = timezone.utc
+_SANITIZE_RE = re.compile(r"[^a-z0-9]+")
+# Labels that the sanitizer would leave unchanged
+_CLEAN_LABEL_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
 
 
 @dataclass
@@ -24,17 +37,58 @@ class CaptureRecord:
     thumbnail_stored: bool = False
 
 
+_WriteJob = Tuple[Path, List[Tuple[Path, bytes]]]
+
+
 class FileSystemDatalake:
-    """Store captures on the local filesystem."""
+    """Store captures on the local filesystem.
+
+    With ``async_writes`` enabled, file writes are handed to a bounded queue
+    drained by a background thread so callers get the record back before the
+    bytes hit disk. A full queue falls back to writing inline. Until a queued
+    write lands, ``pending_bytes`` returns its content so readers can serve a
+    capture that is not on disk yet.
+    """
 
-    def __init__(self, root: Path) -> None:
+    def __init__(
+        self,
+        root: Path,
+        *,
+        async_writes: bool = False,
+        write_queue_size: int = 64,
+    ) -> None:
         self._root = root
         self._root.mkdir(parents=True, exist_ok=True)
+        self._write_queue: queue.Queue[_WriteJob | None] | None = None
+        self._writer: threading.Thread | None = None
+        # Date directories known to exist, so mkdir runs once per day
+        self._known_dirs: set[Path] = set()
+        # Content of queued writes by path, dropped once the file is written
+        self._pending: dict[Path, bytes] = {}
+        self._pending_lock = threading.Lock()
+        if async_writes:
+            self._write_queue = queue.Queue(maxsize=max(1, write_queue_size))
+            self._writer = threading.Thread(
+                target=self._drain_writes, name="datalake-writer", daemon=True
+            )
+            self._writer.start()
 
     @property
     def root(self) -> Path:
         return self._root
 
+    def reserve_record(
+        self,
+        device_id: str | None,
+        *,
+        captured_at: datetime | None = None,
+        ingested_at: datetime | None = None,
+    ) -> Tuple[str, datetime, datetime]:
+        """Return the record id and UTC timestamps a capture will be stored under."""
+        ingest_time = _ensure_utc(ingested_at) if ingested_at else datetime.now(tz=_UTC)
+        capture_time = _ensure_utc(captured_at) if captured_at else ingest_time
+        return _build_record_id(device_id, capture_time), capture_time, ingest_time
+
     def store_capture(
         self,
         image_bytes: bytes | None,
@@ -47,30 +101,36 @@ class FileSystemDatalake:
         captured_at: datetime | None = None,
         ingested_at: datetime | None = None,
         device_id: str | None = None,
+        wait: bool = False,
     ) -> CaptureRecord:
-        ingest_time = (ingested_at or datetime.now(tz=timezone.utc)).astimezone(
-            timezone.utc
+        """Persist a capture and return its record.
+
+        When the datalake writes asynchronously the files may not exist yet on
+        return; pass ``wait=True`` when the caller reads them back immediately.
+        """
+        record_id, capture_time, ingest_time = self.reserve_record(
+            device_id or metadata.get("device_id"),
+            captured_at=captured_at,
+            ingested_at=ingested_at,
         )
-        capture_time = (captured_at or ingest_time).astimezone(timezone.utc)
         date_dir = self._root / capture_time.strftime("%Y/%m/%d")
-        date_dir.mkdir(parents=True, exist_ok=True)
-
-        record_id = _build_record_id(device_id or metadata.get("device_id"), capture_time)
         image_path = date_dir / f"{record_id}.jpeg"
         thumbnail_path = date_dir / f"{record_id}_thumb.jpeg"
         metadata_path = date_dir / f"{record_id}.json"
 
+        writes: List[Tuple[Path, bytes]] = []
+
         # Store full image
         image_stored = bool(store_image and image_bytes is not None)
         if store_image:
             if image_bytes is None:
                 raise ValueError("image_bytes must be provided when store_image=True")
-            image_path.write_bytes(image_bytes)
+            writes.append((image_path, image_bytes))
 
         # Store thumbnail if provided
         thumbnail_stored = bool(thumbnail_bytes is not None)
         if thumbnail_bytes is not None:
-            thumbnail_path.write_bytes(thumbnail_bytes)
+            writes.append((thumbnail_path, thumbnail_bytes))
 
         payload = {
             "record_id": record_id,
@@ -84,7 +144,9 @@ class FileSystemDatalake:
             "thumbnail_stored": thumbnail_stored,
             "thumbnail_filename": thumbnail_path.name if thumbnail_stored else None,
         }
-        metadata_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        # Metadata goes last so readers never see a record without its image
+        writes.append((metadata_path, orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)))
+        self._submit((date_dir, writes), wait=wait)
         return CaptureRecord(
             record_id=record_id,
             image_path=image_path,
@@ -99,11 +161,112 @@ class FileSystemDatalake:
             thumbnail_stored=thumbnail_stored,
         )
 
+    def pending_bytes(self, path: Path) -> bytes | None:
+        """Return the content queued for ``path`` if it has not been written yet."""
+        if self._write_queue is None:
+            return None
+        with self._pending_lock:
+            return self._pending.get(path)
+
+    def is_pending(self, path: Path) -> bool:
+        """Return True while a queued write for ``path`` has not landed."""
+        return self.pending_bytes(path) is not None
+
+    def flush(self) -> None:
+        """Block until every queued write has been performed."""
+        if self._write_queue is not None:
+            self._write_queue.join()
+
+    def close(self) -> None:
+        """Flush pending writes and stop the background writer."""
+        if self._write_queue is None or self._writer is None:
+            return
+        self._write_queue.put(None)
+        self._writer.join()
+        self._write_queue = None
+        self._writer = None
+
+    def _submit(self, job: _WriteJob, *, wait: bool) -> None:
+        write_queue = self._write_queue
+        if write_queue is None or wait:
+            self._perform_writes(job)
+            return
+        # Registered before queueing so there is no gap in which the capture
+        # is neither pending nor on disk
+        self._set_pending(job, pending=True)
+        try:
+            write_queue.put_nowait(job)
+        except queue.Full:
+            # Backpressure: the writer is behind, so write inline
+            try:
+                self._perform_writes(job)
+            finally:
+                self._set_pending(job, pending=False)
+
+    def _set_pending(self, job: _WriteJob, *, pending: bool) -> None:
+        _, writes = job
+        with self._pending_lock:
+            for path, data in writes:
+                if pending:
+                    self._pending[path] = data
+                else:
+                    self._pending.pop(path, None)
+
+    def _drain_writes(self) -> None:
+        write_queue = self._write_queue
+        assert write_queue is not None
+        while True:
+            job = write_queue.get()
+            try:
+                if job is None:
+                    return
+                try:
+                    self._perform_writes(job)
+                finally:
+                    self._set_pending(job, pending=False)
+            except Exception:
+                logger.exception("Failed to write capture files dir=%s", job[0])
+            finally:
+                write_queue.task_done()
+
+    def _perform_writes(self, job: _WriteJob) -> None:
+        date_dir, writes = job
+        if date_dir not in self._known_dirs:
+            date_dir.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(date_dir)
+        for index, (path, data) in enumerate(writes):
+            try:
+                _write_file(path, data)
+            except FileNotFoundError:
+                if index:
+                    raise
+                # The directory was removed behind our back; recreate it once
+                date_dir.mkdir(parents=True, exist_ok=True)
+                _write_file(path, data)
+
+
+def _ensure_utc(value: datetime) -> datetime:
+    # Most callers already pass UTC-aware datetimes; skip the conversion then
+    return value if value.tzinfo is _UTC else value.astimezone(_UTC)
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
 
 def _build_record_id(device_label: Optional[str], capture_time: datetime) -> str:
     label = str(device_label or "device").strip().lower()
-    sanitized = re.sub(r"[^a-z0-9]+", "-", label)
-    sanitized = sanitized.strip("-") or "device"
+    if _CLEAN_LABEL_RE.fullmatch(label):
+        sanitized = label
+    else:
+        sanitized = _SANITIZE_RE.sub("-", label).strip("-") or "device"
     if len(sanitized) > 48:
         sanitized = sanitized[:48].rstrip("-") or "device"
     timestamp_fragment = capture_time.strftime("%Y%m%dT%H%M%S%fZ")
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-import json
+import mmap
+import os
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Collection, Iterator, Optional
+
+import orjson
+
+try:  # pragma: no cover - optional C accelerator
+    import ciso8601  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - fall back to datetime.fromisoformat
+    ciso8601 = None  # type: ignore[assignment]
 
 
 @dataclass
@@ -20,7 +29,6 @@ class CaptureSummary:
     image_path: Optional[Path]
     image_available: bool
     captured_at_dt: Optional[datetime]
-    ingested_at_dt: Optional[datetime]
     agent_details: Optional[dict] = None
 
 
@@ -32,6 +40,28 @@ def parse_capture_timestamp(value: str | None) -> datetime | None:
     if not text:
         return None
 
+    parsed = _parse_iso_fast(text) if ciso8601 is not None else None
+    if parsed is None:
+        parsed = _parse_iso_builtin(text)
+    if parsed is None:
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return parsed
+
+
+def _parse_iso_fast(text: str) -> datetime | None:
+    # ciso8601 handles the space separator and trailing "Z" natively; anything
+    # it rejects still gets a chance with the builtin parser
+    try:
+        return ciso8601.parse_datetime(text)
+    except ValueError:
+        return None
+
+
+def _parse_iso_builtin(text: str) -> datetime | None:
     if " " in text and "T" not in text:
         text = text.replace(" ", "T", 1)
 
@@ -39,28 +69,55 @@ def parse_capture_timestamp(value: str | None) -> datetime | None:
         text = f"{text[:-1]}+00:00"
 
     try:
-        parsed = datetime.fromisoformat(text)
+        return datetime.fromisoformat(text)
     except ValueError:
         return None
 
-    if parsed.tzinfo is None:
-        parsed = parsed.replace(tzinfo=timezone.utc)
 
-    return parsed
+_IMAGE_SUFFIXES = (".jpeg", ".jpg", ".png")
+# Capture JSONs at least this large are parsed straight from a memory map
+_MMAP_THRESHOLD = 256 * 1024
+
+
+def capture_image_names(stem: str) -> tuple[str, ...]:
+    """Return the file names a capture image for ``stem`` may be stored under."""
+    return tuple(f"{stem}{ext}" for ext in _IMAGE_SUFFIXES)
+
 
+def find_capture_image(
+    json_path: Path, available: Collection[str] | None = None
+) -> Optional[Path]:
+    """Locate the image stored next to ``json_path``.
 
-def find_capture_image(json_path: Path) -> Optional[Path]:
-    for ext in (".jpeg", ".jpg", ".png"):
-        candidate = json_path.with_suffix(ext)
+    ``available`` holds sibling file names already known to exist (e.g. from
+    a directory scan); when given, no filesystem probes are made.
+    """
+    for name in capture_image_names(json_path.stem):
+        if available is not None:
+            if name in available:
+                return json_path.parent / name
+            continue
+        candidate = json_path.parent / name
         if candidate.exists():
             return candidate
     return None
 
 
-def load_capture_summary(json_path: Path) -> Optional[CaptureSummary]:
+def _read_json(path: Path) -> Any:
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size < _MMAP_THRESHOLD:
+            return orjson.loads(handle.read())
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+
+
+def load_capture_summary(
+    json_path: Path, available_images: Collection[str] | None = None
+) -> Optional[CaptureSummary]:
     try:
-        payload = json.loads(json_path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
+        payload = _read_json(json_path)
+    except (OSError, orjson.JSONDecodeError):
         return None
 
     classification = payload.get("classification", {})
@@ -90,16 +147,20 @@ def load_capture_summary(json_path: Path) -> Optional[CaptureSummary]:
     captured_at_dt = parse_capture_timestamp(captured_at_raw)
 
     ingested_at_raw = payload.get("ingested_at")
-    ingested_at_dt = parse_capture_timestamp(ingested_at_raw)
 
     image_filename = payload.get("image_filename")
     image_path = None
     if isinstance(image_filename, str) and image_filename.strip():
-        candidate = json_path.parent / image_filename.strip()
-        if candidate.exists():
+        name = image_filename.strip()
+        candidate = json_path.parent / name
+        if (
+            name in available_images
+            if available_images is not None
+            else candidate.exists()
+        ):
             image_path = candidate
     if image_path is None:
-        image_path = find_capture_image(json_path)
+        image_path = find_capture_image(json_path, available_images)
     description_file = payload.get("normal_description_file")
     if isinstance(description_file, str):
         description_file = description_file.strip() or None
@@ -119,14 +180,156 @@ def load_capture_summary(json_path: Path) -> Optional[CaptureSummary]:
         image_path=image_path,
         image_available=image_available,
         captured_at_dt=captured_at_dt,
-        ingested_at_dt=ingested_at_dt,
         agent_details=agent_details,
     )
 
 
+# Directory listings keyed by (path, kind) -> (directory mtime_ns, listing).
+# Adding or removing a file bumps the directory mtime, so a repeat poll costs
+# one stat per directory instead of a full scandir.
+_listing_cache: dict[tuple[str, str], tuple[int, Any]] = {}
+# Listings of directories modified this recently are not cached: a coarse
+# filesystem clock could give a later write the same mtime and hide it.
+_LISTING_SETTLE_NS = 2_000_000_000
+
+
+def _cached_listing(directory: Path, kind: str, build: Callable[[], Any]) -> Any:
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+    key = (str(directory), kind)
+    cached = _listing_cache.get(key)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    try:
+        listing = build()
+    except OSError:
+        return None
+    if time.time_ns() - mtime_ns > _LISTING_SETTLE_NS:
+        _listing_cache[key] = (mtime_ns, listing)
+    else:
+        _listing_cache.pop(key, None)
+    return listing
+
+
+def _sorted_subdirs(directory: Path, width: int) -> list[Path]:
+    """Return ``directory``'s numeric partition subdirectories, newest first."""
+
+    def build() -> list[str]:
+        with os.scandir(directory) as entries:
+            names = [
+                entry.name
+                for entry in entries
+                if len(entry.name) == width
+                and entry.name.isdigit()
+                and entry.is_dir()
+            ]
+        names.sort(reverse=True)
+        return names
+
+    names = _cached_listing(directory, "subdirs", build) or []
+    return [directory / name for name in names]
+
+
+def iter_capture_days(
+    root: Path,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> Iterator[Path]:
+    """Yield ``YYYY/MM/DD`` datalake partitions newest-first within ``start``..``end``."""
+    start_key = start.astimezone(timezone.utc).strftime("%Y%m%d") if start else None
+    end_key = end.astimezone(timezone.utc).strftime("%Y%m%d") if end else None
+    # Keys compare as strings; a year or month prefix is out of range when it
+    # sorts after the matching prefix of ``end`` or before that of ``start``
+    for year_dir in _sorted_subdirs(root, 4):
+        year_key = year_dir.name
+        if end_key is not None and year_key > end_key[:4]:
+            continue
+        if start_key is not None and year_key < start_key[:4]:
+            return
+        for month_dir in _sorted_subdirs(year_dir, 2):
+            month_key = year_key + month_dir.name
+            if end_key is not None and month_key > end_key[:6]:
+                continue
+            if start_key is not None and month_key < start_key[:6]:
+                return
+            for day_dir in _sorted_subdirs(month_dir, 2):
+                day_key = month_key + day_dir.name
+                if end_key is not None and day_key > end_key:
+                    continue
+                if start_key is not None and day_key < start_key:
+                    return
+                yield day_dir
+
+
+def scan_capture_day(day_dir: Path) -> tuple[list[str], frozenset[str]]:
+    """Return ``day_dir``'s capture JSON file names, newest first, and all file names.
+
+    Record ids embed the capture timestamp after the device label
+    (``<device>_<YYYYmmddTHHMMSSffffffZ>_<suffix>``), so that fragment orders
+    captures across devices without reading the files. The name set lets
+    image lookups avoid per-capture stat calls. Only names are cached; callers
+    stat the files themselves, since rewriting a file leaves the directory
+    mtime unchanged.
+    """
+
+    def build() -> tuple[list[str], frozenset[str]]:
+        with os.scandir(day_dir) as entries:
+            all_entries = list(entries)
+        file_names = frozenset(entry.name for entry in all_entries)
+        json_names = [
+            entry.name
+            for entry in all_entries
+            if entry.name.endswith(".json") and entry.is_file()
+        ]
+        json_names.sort(key=_record_timestamp_key, reverse=True)
+        return json_names, file_names
+
+    listing = _cached_listing(day_dir, "captures", build)
+    if listing is None:
+        return [], frozenset()
+    json_names, file_names = listing
+    return list(json_names), file_names
+
+
+def _record_timestamp_key(file_name: str) -> str:
+    parts = file_name[: -len(".json")].rsplit("_", 2)
+    return parts[1] if len(parts) == 3 else ""
+
+
+def record_id_timestamp(record_id: str) -> datetime | None:
+    """Return the capture time embedded in a datalake record id, if any."""
+    parts = record_id.rsplit("_", 2)
+    if len(parts) != 3:
+        return None
+    # Fixed layout YYYYmmddTHHMMSSffffffZ, so slice instead of strptime
+    text = parts[1]
+    if len(text) != 22 or text[8] != "T" or text[21] != "Z":
+        return None
+    try:
+        return datetime(
+            int(text[0:4]),
+            int(text[4:6]),
+            int(text[6:8]),
+            int(text[9:11]),
+            int(text[11:13]),
+            int(text[13:15]),
+            int(text[15:21]),
+            tzinfo=timezone.utc,
+        )
+    except ValueError:
+        return None
+
+
 __all__ = [
     "CaptureSummary",
+    "capture_image_names",
     "find_capture_image",
+    "iter_capture_days",
     "load_capture_summary",
     "parse_capture_timestamp",
+    "record_id_timestamp",
+    "scan_capture_day",
 ]
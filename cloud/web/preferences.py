@@ -4,7 +4,7 @@ import json
 from pathlib import Path
 from typing import List
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 
 DEFAULT_CAPTURE_STATES: List[str] = ["normal", "abnormal", "uncertain"]
 CAPTURE_LIMIT_DEFAULT = 12
@@ -17,8 +17,9 @@ class CaptureFilterPreferences(BaseModel):
     to_dt: str | None = None
     limit: int = CAPTURE_LIMIT_DEFAULT
 
-    @validator("states", pre=True, always=True)
-    def _sanitize_states(cls, value: object) -> List[str]:  # type: ignore[override]
+    @field_validator("states", mode="before")
+    @classmethod
+    def _sanitize_states(cls, value: object) -> List[str]:
         items: List[str] = []
         if isinstance(value, list):
             for entry in value:
@@ -31,8 +32,9 @@ class CaptureFilterPreferences(BaseModel):
             return list(DEFAULT_CAPTURE_STATES)
         return items
 
-    @validator("limit", pre=True, always=True)
-    def _clamp_limit(cls, value: object) -> int:  # type: ignore[override]
+    @field_validator("limit", mode="before")
+    @classmethod
+    def _clamp_limit(cls, value: object) -> int:
         try:
             limit = int(value)
         except (TypeError, ValueError):
@@ -53,11 +55,12 @@ def load_preferences(path: Path) -> UIPreferences:
     if not path.exists():
         return UIPreferences()
     try:
-        raw = json.loads(path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
+        raw = path.read_bytes()
+    except OSError:
         return UIPreferences()
     try:
-        return UIPreferences.parse_obj(raw)
+        # Parses and validates in one pass inside pydantic-core
+        return UIPreferences.model_validate_json(raw)
     except Exception:
         return UIPreferences()
 
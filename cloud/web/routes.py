@@ -1,15 +1,22 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
+import heapq
 import logging
+import os
 import re
-import uuid
-from datetime import datetime, timezone, timedelta
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, List, Optional, Sequence, Set
+from typing import Any, Collection, List, Optional, Sequence, Set
 
-from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import FileResponse, HTMLResponse
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse
 from pydantic import BaseModel, Field
 
 from ..api.email_service import create_sendgrid_service
@@ -26,9 +33,13 @@ from .preferences import (
 )
 from .capture_utils import (
     CaptureSummary,
+    capture_image_names,
     find_capture_image,
+    iter_capture_days,
     load_capture_summary,
     parse_capture_timestamp,
+    record_id_timestamp,
+    scan_capture_day,
 )
 
 
@@ -37,6 +48,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["ui"])
 
 INDEX_HTML = Path(__file__).parent / "templates" / "index.html"
+# Set to "1" to re-read UI templates on every request while developing
+TEMPLATE_RELOAD_ENV = "OKMONITOR_UI_TEMPLATE_RELOAD"
 
 
 MIN_TRIGGER_INTERVAL_SECONDS = 7.0
@@ -77,15 +90,26 @@ class PreferencesPayload(UIPreferences):
 
 _ALLOWED_CAPTURE_STATES: Set[str] = set(DEFAULT_CAPTURE_STATES)
 _MAX_CAPTURE_LIMIT = CAPTURE_LIMIT_MAX
-_EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+_SUMMARY_CACHE_SIZE = 4096
+# LRU of parsed summaries keyed by (json path, mtime_ns, size, record images
+# present); listings run in worker threads, so access goes through the lock
+_summary_cache: OrderedDict[
+    tuple[str, int, int, tuple[str, ...]], Optional[CaptureSummary]
+] = OrderedDict()
+_summary_cache_lock = threading.Lock()
+_UNCACHED = object()
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_RECORD_ID_PLACEHOLDER = "__record_id__"
+_SORT_ANCHOR = datetime.fromtimestamp(0, tz=timezone.utc)
+_RECORD_DATE_PATTERN = re.compile(r".*_(\d{4})(\d{2})(\d{2})T\d{12}Z_[0-9a-f]{8}$")
 
 
 def _serialize_capture_summary(summary: CaptureSummary, request: Request) -> dict[str, Any]:
     image_url = None
     download_url = None
     if summary.image_available and summary.image_path is not None:
-        image_route = request.url_for("serve_capture_image", record_id=summary.record_id)
-        image_url = image_route.path or str(image_route)
+        image_url = _capture_image_url(request, summary.record_id)
         download_url = f"{image_url}?download=1"
     return {
         "record_id": summary.record_id,
@@ -103,6 +127,19 @@ def _serialize_capture_summary(summary: CaptureSummary, request: Request) -> dic
     }
 
 
+def _capture_image_url(request: Request, record_id: str) -> str:
+    # Resolve the route once per request; listings format every record id
+    # into the same path instead of repeating the router lookup
+    template = getattr(request.state, "capture_image_url", None)
+    if template is None:
+        image_route = request.url_for(
+            "serve_capture_image", record_id=_RECORD_ID_PLACEHOLDER
+        )
+        template = image_route.path or str(image_route)
+        request.state.capture_image_url = template
+    return template.replace(_RECORD_ID_PLACEHOLDER, record_id)
+
+
 def _get_preferences(request: Request) -> UIPreferences:
     prefs = getattr(request.app.state, "ui_preferences", None)
     if isinstance(prefs, UIPreferences):
@@ -121,11 +158,30 @@ def _preferences_path(request: Request) -> Path:
     return Path(path)
 
 
+_template_cache: dict[Path, tuple[bytes, str]] = {}
+
+
+def _load_template(path: Path) -> tuple[bytes, str]:
+    """Return a template's bytes and ETag, read from disk only once."""
+    cached = _template_cache.get(path)
+    if cached is None or os.environ.get(TEMPLATE_RELOAD_ENV) == "1":
+        content = path.read_bytes()
+        cached = (content, f'"{hashlib.sha1(content).hexdigest()}"')
+        _template_cache[path] = cached
+    return cached
+
+
 @router.get("/ui", response_class=HTMLResponse)
-async def ui_root() -> HTMLResponse:
-    if not INDEX_HTML.exists():
+async def ui_root(request: Request) -> Response:
+    try:
+        content, etag = _load_template(INDEX_HTML)
+    except OSError:
         raise HTTPException(status_code=500, detail="UI template missing")
-    return HTMLResponse(INDEX_HTML.read_text(encoding="utf-8"))
+    # no-cache lets browsers keep the page but revalidate it with the ETag
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content, headers=headers)
 
 
 @router.get("/favicon.ico")
@@ -138,8 +194,8 @@ async def favicon_fallback() -> FileResponse:
     return FileResponse(favicon_path, media_type="image/png")
 
 
-@router.get("/ui/state")
-async def ui_state(request: Request) -> dict[str, Any]:
+@router.get("/ui/state", response_class=ORJSONResponse)
+async def ui_state(request: Request) -> ORJSONResponse:
     config_state = getattr(request.app.state, "trigger_config", None)
     enabled = getattr(config_state, "enabled", False)
     interval = getattr(config_state, "interval_seconds", None)
@@ -161,11 +217,11 @@ async def ui_state(request: Request) -> dict[str, Any]:
     last_seen = getattr(request.app.state, "device_last_seen", None)
     last_ip = getattr(request.app.state, "device_last_ip", None)
     ttl_seconds = float(getattr(request.app.state, "device_status_ttl", 30.0))
-    now = datetime.now(timezone.utc)
     connected = False
     last_seen_iso: str | None = None
     if isinstance(last_seen, datetime):
-        if now - last_seen <= timedelta(seconds=ttl_seconds):
+        # Compare epoch seconds rather than building now() and a timedelta
+        if time.time() - last_seen.timestamp() <= ttl_seconds:
             connected = True
         last_seen_iso = last_seen.isoformat()
     notification_settings: NotificationSettings = getattr(
@@ -185,7 +241,7 @@ async def ui_state(request: Request) -> dict[str, Any]:
         "threshold": int(getattr(request.app.state, "dedupe_threshold", 3)),
         "keep_every": int(getattr(request.app.state, "dedupe_keep_every", 5)),
     }
-    return {
+    payload = {
         "normal_description": normal_description,
         "normal_description_file": getattr(
             request.app.state, "normal_description_file", None
@@ -207,6 +263,7 @@ async def ui_state(request: Request) -> dict[str, Any]:
         "notifications": notifications_payload,
         "dedupe": dedupe_settings,
     }
+    return ORJSONResponse(payload)
 
 
 @router.get("/ui/preferences")
@@ -223,7 +280,7 @@ async def set_ui_preferences(
     request.app.state.ui_preferences = preferences
     path = _preferences_path(request)
     try:
-        save_preferences(path, preferences)
+        await asyncio.to_thread(save_preferences, path, preferences)
     except Exception as exc:
         logger.error("Failed to save UI preferences to %s: %s", path, exc)
         raise HTTPException(status_code=500, detail="Failed to save preferences") from exc
@@ -264,12 +321,13 @@ async def update_normal_description(
         Path(store_dir) if store_dir else Path("config/normal_descriptions")
     )
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    file_suffix = uuid.uuid4().hex[:8]
+    file_suffix = secrets.token_hex(4)
     file_name = f"normal_{timestamp}_{file_suffix}.txt"
     target_path = store_dir_path / file_name
     try:
-        store_dir_path.mkdir(parents=True, exist_ok=True)
-        target_path.write_text(description, encoding="utf-8")
+        await asyncio.to_thread(
+            _write_normal_description, store_dir_path, target_path, description
+        )
     except OSError as exc:  # pragma: no cover - filesystem error surfaced to client
         raise HTTPException(
             status_code=500, detail=f"Failed to persist description: {exc}"
@@ -286,7 +344,9 @@ async def update_normal_description(
     server_config_path = getattr(request.app.state, "server_config_path", None)
     if server_config_path:
         try:
-            update_active_normal_description(server_config_path, file_name)
+            await asyncio.to_thread(
+                update_active_normal_description, server_config_path, file_name
+            )
         except OSError as exc:
             logger.error(
                 "Failed to persist active normal description to %s: %s",
@@ -317,8 +377,6 @@ async def update_normal_description(
 async def update_trigger(
     payload: TriggerConfigPayload, request: Request
 ) -> dict[str, Any]:
-    config_state = getattr(request.app.state, "trigger_config", None)
-
     if payload.enabled and (
         payload.interval_seconds is None
         or payload.interval_seconds < MIN_TRIGGER_INTERVAL_SECONDS
@@ -328,27 +386,19 @@ async def update_trigger(
             detail=f"Interval must be at least {MIN_TRIGGER_INTERVAL_SECONDS:.0f} seconds",
         )
 
-    if hasattr(config_state, "enabled"):
-        config_state.enabled = payload.enabled
-        config_state.interval_seconds = (
-            payload.interval_seconds if payload.enabled else None
-        )
-        enabled = config_state.enabled
-        interval = config_state.interval_seconds
-    else:
-        config_state = {
-            "enabled": payload.enabled,
-            "interval_seconds": payload.interval_seconds if payload.enabled else None,
-        }
-        request.app.state.trigger_config = config_state
-        enabled = config_state["enabled"]
-        interval = config_state["interval_seconds"]
+    # create_app always installs a TriggerConfig, which the trigger loop reads
+    enabled = payload.enabled
+    interval = payload.interval_seconds if enabled else None
+    config_state = request.app.state.trigger_config
+    config_state.enabled = enabled
+    config_state.interval_seconds = interval
 
     # Persist trigger configuration to survive Railway deployments
     server_config_path = getattr(request.app.state, "server_config_path", None)
     if server_config_path:
         try:
-            update_trigger_config(
+            await asyncio.to_thread(
+                update_trigger_config,
                 server_config_path,
                 enabled=enabled,
                 interval_seconds=interval,
@@ -371,10 +421,17 @@ async def update_trigger(
 async def update_notifications(
     payload: NotificationSettingsPayload, request: Request
 ) -> dict[str, Any]:
-    recipients = [
-        value.strip() for value in payload.email_recipients if isinstance(value, str)
-    ]
-    recipients = [value for value in recipients if value]
+    recipients: list[str] = []
+    invalid: list[str] = []
+    for value in payload.email_recipients:
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        if not value:
+            continue
+        recipients.append(value)
+        if not _EMAIL_PATTERN.fullmatch(value):
+            invalid.append(value)
 
     if payload.email_enabled and not recipients:
         raise HTTPException(
@@ -382,7 +439,6 @@ async def update_notifications(
             detail="Provide at least one email recipient to enable notifications.",
         )
 
-    invalid = [value for value in recipients if not _EMAIL_PATTERN.match(value)]
     if invalid:
         human_list = ", ".join(invalid)
         raise HTTPException(
@@ -434,7 +490,7 @@ async def update_notifications(
     config_path = getattr(request.app.state, "notification_config_path", None)
     if isinstance(config_path, Path):
         try:
-            save_notification_settings(config_path, sanitized)
+            await asyncio.to_thread(save_notification_settings, config_path, sanitized)
         except OSError as exc:  # pragma: no cover - filesystem error surfaced to client
             raise HTTPException(
                 status_code=500,
@@ -459,14 +515,14 @@ async def update_notifications(
     }
 
 
-@router.get("/ui/captures")
+@router.get("/ui/captures", response_class=ORJSONResponse)
 async def list_captures(
     request: Request,
     limit: int = 12,
     state: list[str] | None = Query(default=None),
     start: str | None = Query(default=None, alias="from"),
     end: str | None = Query(default=None, alias="to"),
-) -> List[dict[str, Any]]:
+) -> ORJSONResponse:
     states, states_explicit = _normalize_state_filters(state)
     start_dt = parse_capture_timestamp(start)
     end_dt = parse_capture_timestamp(end)
@@ -484,57 +540,31 @@ async def list_captures(
 
     clamped_limit = max(0, min(limit, _MAX_CAPTURE_LIMIT))
     if clamped_limit == 0:
-        return []
+        return ORJSONResponse([])
 
     if states_explicit and states is not None and not states:
-        return []
+        return ORJSONResponse([])
 
     datalake_root: Path | None = getattr(request.app.state, "datalake_root", None)
     if datalake_root is None or not datalake_root.exists():
-        return []
+        return ORJSONResponse([])
 
     capture_index = getattr(request.app.state, "capture_index", None)
-    summaries: List[CaptureSummary] = []
-    use_index = (
-        capture_index is not None
-        and not states_explicit
-        and start_dt is None
-        and end_dt is None
+    # Directory walks and JSON reads block, so keep them off the event loop
+    summaries = await asyncio.to_thread(
+        _gather_capture_summaries,
+        datalake_root,
+        clamped_limit,
+        capture_index,
+        states=states,
+        start=start_dt,
+        end=end_dt,
     )
 
-    if use_index:
-        summaries = capture_index.latest(clamped_limit)
-        if len(summaries) < clamped_limit:
-            exclude_ids = {summary.record_id for summary in summaries}
-            remaining = clamped_limit - len(summaries)
-            if remaining > 0:
-                summaries.extend(
-                    _collect_recent_captures(
-                        datalake_root,
-                        remaining,
-                        states=states,
-                        start=start_dt,
-                        end=end_dt,
-                        exclude_ids=exclude_ids,
-                    )
-                )
-    else:
-        summaries = _collect_recent_captures(
-            datalake_root,
-            clamped_limit,
-            states=states,
-            start=start_dt,
-            end=end_dt,
-        )
-
-    sort_anchor = datetime.fromtimestamp(0, tz=timezone.utc)
-    summaries.sort(key=lambda item: item.captured_at_dt or sort_anchor, reverse=True)
-    summaries = summaries[:clamped_limit]
-
-    captures: List[dict[str, Any]] = []
-    for summary in summaries:
-        captures.append(_serialize_capture_summary(summary, request))
-    return captures
+    # The serialized summaries are plain JSON types, so skip FastAPI's encoder
+    return ORJSONResponse(
+        [_serialize_capture_summary(summary, request) for summary in summaries]
+    )
 
 
 @router.get("/ui/captures/{record_id}")
@@ -550,52 +580,80 @@ async def fetch_capture_metadata(record_id: str, request: Request) -> dict[str,
         except Exception:
             summary = None
     if summary is None:
-        json_path = _find_capture_json(datalake_root, record_id)
+        json_path = await asyncio.to_thread(_find_capture_json, datalake_root, record_id)
         if json_path is None:
             raise HTTPException(status_code=404, detail="Capture not found")
-        summary = load_capture_summary(json_path)
+        summary = await asyncio.to_thread(load_capture_summary, json_path)
     if summary is None:
         raise HTTPException(status_code=404, detail="Capture not found")
     return _serialize_capture_summary(summary, request)
 
 
-@router.get("/ui/captures/{record_id}/image")
+@router.api_route("/ui/captures/{record_id}/image", methods=["GET", "HEAD"])
 async def serve_capture_image(
     record_id: str, request: Request, download: bool = False
-) -> FileResponse:
+) -> Response:
     datalake_root: Path | None = getattr(request.app.state, "datalake_root", None)
     if datalake_root is None:
         raise HTTPException(status_code=404, detail="Capture not found")
 
-    json_path = _find_capture_json(datalake_root, record_id)
-    if json_path is None:
-        raise HTTPException(status_code=404, detail="Capture not found")
-
-    image_path = None
-    try:
-        payload = json.loads(json_path.read_text(encoding="utf-8"))
-        image_name = payload.get("image_filename")
-        if isinstance(image_name, str) and image_name.strip():
-            candidate = json_path.parent / image_name.strip()
-            if candidate.exists():
-                image_path = candidate
-    except (OSError, json.JSONDecodeError):
-        image_path = None
+    # Recent captures already know their image path; older ones are resolved
+    # from the partition the record id names
+    image_path: Path | None = None
+    capture_index = getattr(request.app.state, "capture_index", None)
+    if capture_index is not None:
+        try:
+            summary = capture_index.get(record_id)
+        except Exception:
+            summary = None
+        if summary is not None:
+            image_path = summary.image_path
 
     if image_path is None:
-        image_path = find_capture_image(json_path)
+        json_path = await asyncio.to_thread(
+            _find_capture_json, datalake_root, record_id
+        )
+        if json_path is None:
+            raise HTTPException(status_code=404, detail="Capture not found")
+        image_path = await asyncio.to_thread(_resolve_capture_image, json_path)
     if image_path is None:
         raise HTTPException(status_code=404, detail="Capture image missing")
 
+    # With asynchronous datalake writes the newest image may still be queued;
+    # serve its bytes until the file lands. They carry no ETag, since the
+    # final one is derived from the written file.
+    datalake = getattr(request.app.state, "datalake", None)
+    pending = datalake.pending_bytes(image_path) if datalake is not None else None
+    if pending is not None:
+        pending_headers = {"Cache-Control": "no-cache"}
+        if download:
+            pending_headers["Content-Disposition"] = (
+                f'attachment; filename="{image_path.name}"'
+            )
+        return Response(pending, media_type="image/jpeg", headers=pending_headers)
+
+    try:
+        stat_result = await asyncio.to_thread(image_path.stat)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Capture image missing")
+
+    # Images are never rewritten under a record id, so browsers may keep them
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": _IMMUTABLE_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
     filename = image_path.name if download else None
-    return FileResponse(image_path, filename=filename)
+    return FileResponse(
+        image_path, filename=filename, stat_result=stat_result, headers=headers
+    )
 
 
 @router.get("/ui/normal-definitions/{file_name}")
 async def fetch_normal_definition(file_name: str, request: Request) -> dict[str, Any]:
-    safe_name = Path(file_name).name
-    if not safe_name or safe_name != file_name:
+    if not _is_plain_file_name(file_name):
         raise HTTPException(status_code=400, detail="Invalid definition identifier")
+    safe_name = file_name
 
     store_dir = getattr(request.app.state, "normal_description_store_dir", None)
     candidates: list[Path] = []
@@ -608,9 +666,46 @@ async def fetch_normal_definition(file_name: str, request: Request) -> dict[str,
         if description_path.name == safe_name:
             candidates.insert(0, description_path)
 
+    found = await asyncio.to_thread(_read_normal_definition, candidates)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Definition not found")
+    description, updated_at = found
+    return {
+        "file": safe_name,
+        "description": description,
+        "updated_at": updated_at,
+    }
+
+
+def _is_plain_file_name(name: str) -> bool:
+    # Plain string checks instead of building a Path; backslashes are refused
+    # too so Windows-style separators cannot reach the filesystem
+    return (
+        bool(name)
+        and name not in (".", "..")
+        and "/" not in name
+        and "\\" not in name
+        and "\x00" not in name
+    )
+
+
+def _write_normal_description(
+    store_dir: Path, target_path: Path, description: str
+) -> None:
+    # The store directory nearly always exists already; create it only when
+    # the first write finds it missing
+    try:
+        target_path.write_text(description, encoding="utf-8")
+    except FileNotFoundError:
+        store_dir.mkdir(parents=True, exist_ok=True)
+        target_path.write_text(description, encoding="utf-8")
+
+
+def _read_normal_definition(candidates: Sequence[Path]) -> tuple[str, str] | None:
+    # Callers pass bare file names joined onto known directories, so plain
+    # path equality is enough to skip duplicates without resolving symlinks
     seen: set[Path] = set()
     for candidate in candidates:
-        candidate = candidate.resolve()
         if candidate in seen:
             continue
         seen.add(candidate)
@@ -620,15 +715,82 @@ async def fetch_normal_definition(file_name: str, request: Request) -> dict[str,
                 updated_at = datetime.fromtimestamp(
                     candidate.stat().st_mtime, tz=timezone.utc
                 ).isoformat()
-                return {
-                    "file": safe_name,
-                    "description": description,
-                    "updated_at": updated_at,
-                }
+                return description, updated_at
         except OSError:
             continue
+    return None
+
+
+def _gather_capture_summaries(
+    datalake_root: Path,
+    limit: int,
+    capture_index: Any,
+    *,
+    states: Set[str] | None,
+    start: datetime | None,
+    end: datetime | None,
+) -> List[CaptureSummary]:
+    """Return up to ``limit`` summaries, newest first, preferring ``capture_index``."""
+    summaries: List[CaptureSummary] = []
+    unfiltered = states is None and start is None and end is None
+    indexed = (
+        capture_index.matching(limit, states=states, start=start, end=end)
+        if capture_index is not None
+        else None
+    )
+    if indexed is not None:
+        # The index answered the whole request from memory
+        summaries = indexed
+    elif capture_index is not None and unfiltered:
+        summaries = capture_index.latest(limit)
+        if len(summaries) < limit:
+            exclude_ids = {summary.record_id for summary in summaries}
+            remaining = limit - len(summaries)
+            if remaining > 0:
+                summaries.extend(
+                    _collect_recent_captures(
+                        datalake_root,
+                        remaining,
+                        states=states,
+                        start=start,
+                        end=end,
+                        exclude_ids=exclude_ids,
+                    )
+                )
+    else:
+        summaries = _collect_recent_captures(
+            datalake_root,
+            limit,
+            states=states,
+            start=start,
+            end=end,
+        )
+
+    if len(summaries) <= 1:
+        return summaries
+    return heapq.nlargest(limit, summaries, key=_summary_sort_key)
+
 
-    raise HTTPException(status_code=404, detail="Definition not found")
+def _summary_sort_key(summary: CaptureSummary) -> datetime:
+    # Captures without a parseable timestamp sort last
+    return summary.captured_at_dt or _SORT_ANCHOR
+
+
+def _resolve_capture_image(json_path: Path) -> Optional[Path]:
+    image_path = None
+    try:
+        payload = orjson.loads(json_path.read_bytes())
+        image_name = payload.get("image_filename")
+        if isinstance(image_name, str) and image_name.strip():
+            candidate = json_path.parent / image_name.strip()
+            if candidate.exists():
+                image_path = candidate
+    except (OSError, orjson.JSONDecodeError):
+        image_path = None
+
+    if image_path is None:
+        image_path = find_capture_image(json_path)
+    return image_path
 
 
 def _collect_recent_captures(
@@ -643,44 +805,92 @@ def _collect_recent_captures(
     if limit <= 0:
         return []
 
-    json_files = sorted(
-        root.glob("**/*.json"),
-        key=lambda path: path.stat().st_mtime,
-        reverse=True,
-    )
     matches: list[tuple[datetime, CaptureSummary]] = []
 
-    for path in json_files:
-        if len(matches) >= limit:
-            break
-
-        summary = load_capture_summary(path)
-        if summary is None:
-            continue
+    # Partitions are walked newest-first, so the walk stops as soon as enough
+    # matches are found instead of scanning the whole datalake
+    for day_dir in iter_capture_days(root, start=start, end=end):
+        json_names, file_names = scan_capture_day(day_dir)
+        for name in json_names:
+            if len(matches) >= limit:
+                break
+
+            # The record id carries the capture time, so files outside the
+            # window are skipped without a stat or a JSON parse
+            if start is not None or end is not None:
+                id_time = record_id_timestamp(name[: -len(".json")])
+                if id_time is not None and (
+                    (start is not None and id_time < start)
+                    or (end is not None and id_time > end)
+                ):
+                    continue
+
+            path_str = os.path.join(day_dir, name)
+            try:
+                stat = os.stat(path_str)
+            except OSError:
+                continue
+            summary = _load_summary_cached(
+                path_str, stat.st_mtime_ns, stat.st_size, file_names
+            )
+            if summary is None:
+                continue
 
-        if exclude_ids and summary.record_id in exclude_ids:
-            continue
+            if exclude_ids and summary.record_id in exclude_ids:
+                continue
 
-        if states is not None and summary.state not in states:
-            continue
+            if states is not None and summary.state not in states:
+                continue
 
-        captured_at_dt = summary.captured_at_dt
-        if start is not None and (captured_at_dt is None or captured_at_dt < start):
-            continue
-        if end is not None and (captured_at_dt is None or captured_at_dt > end):
-            continue
+            captured_at_dt = summary.captured_at_dt
+            if start is not None and (captured_at_dt is None or captured_at_dt < start):
+                continue
+            if end is not None and (captured_at_dt is None or captured_at_dt > end):
+                continue
 
-        try:
-            mtime = path.stat().st_mtime
-        except OSError:
-            mtime = 0.0
-        fallback_dt = datetime.fromtimestamp(mtime, tz=timezone.utc)
-        sort_key = captured_at_dt or fallback_dt
+            sort_key = (
+                captured_at_dt
+                or record_id_timestamp(summary.record_id)
+                or datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+            )
 
-        matches.append((sort_key, summary))
+            matches.append((sort_key, summary))
+        if len(matches) >= limit:
+            break
 
-    matches.sort(key=lambda item: item[0], reverse=True)
-    return [summary for _, summary in matches[:limit]]
+    newest = heapq.nlargest(limit, matches, key=lambda item: item[0])
+    return [summary for _, summary in newest]
+
+
+def _load_summary_cached(
+    path_str: str, mtime_ns: int, size: int, file_names: Collection[str]
+) -> Optional[CaptureSummary]:
+    # Capture JSONs are written once; mtime and size are part of the key so a
+    # rewritten file is parsed again. The images named after the record are
+    # part of it too, so pruned images invalidate the cached summary.
+    stem = os.path.basename(path_str)[: -len(".json")]
+    images = tuple(name for name in capture_image_names(stem) if name in file_names)
+    key = (path_str, mtime_ns, size, images)
+    with _summary_cache_lock:
+        summary = _summary_cache.get(key, _UNCACHED)
+        if summary is not _UNCACHED:
+            _summary_cache.move_to_end(key)
+    if summary is not _UNCACHED and (
+        summary is None
+        or summary.image_path is None
+        # image_filename may name a file with another stem, which the key
+        # does not cover, so confirm it is still in the listing
+        or summary.image_path.name in file_names
+    ):
+        return summary
+    # Parsed outside the lock so concurrent listings do not serialise on I/O
+    summary = load_capture_summary(Path(path_str), available_images=file_names)
+    with _summary_cache_lock:
+        _summary_cache[key] = summary
+        _summary_cache.move_to_end(key)
+        while len(_summary_cache) > _SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    return summary
 
 
 def _normalize_state_filters(
@@ -701,6 +911,13 @@ def _normalize_state_filters(
 
 
 def _find_capture_json(root: Path, record_id: str) -> Optional[Path]:
+    # Record ids embed the capture date, which names the partition directory
+    match = _RECORD_DATE_PATTERN.match(record_id)
+    if match is not None:
+        year, month, day = match.groups()
+        candidate = root / year / month / day / f"{record_id}.json"
+        return candidate if candidate.is_file() else None
+    # Ids that do not follow the datalake naming need the full search
     pattern = f"**/{record_id}.json"
     for path in root.glob(pattern):
         if path.is_file():
@@ -712,21 +929,20 @@ def _apply_normal_description(classifier: Any, description: str) -> None:
     if classifier is None:
         return
     visited: set[int] = set()
-
-    def _walk(target: Any) -> None:
-        if target is None:
-            return
+    # Pushed secondary-first so primaries are still updated first
+    stack: list[Any] = [classifier]
+    while stack:
+        target = stack.pop()
         identifier = id(target)
         if identifier in visited:
-            return
+            continue
         visited.add(identifier)
         if hasattr(target, "normal_description"):
             setattr(target, "normal_description", description)
-        for attr in ("primary", "secondary"):
+        for attr in ("secondary", "primary"):
             child = getattr(target, attr, None)
-            _walk(child)
-
-    _walk(classifier)
+            if child is not None:
+                stack.append(child)
 
 
 # Timing Debug Endpoints
@@ -735,11 +951,13 @@ TIME_LOG_HTML = Path(__file__).parent / "templates" / "time_log.html"
 
 
 @router.get("/ui/time_log", response_class=HTMLResponse)
-def time_log_page() -> HTMLResponse:
+async def time_log_page() -> HTMLResponse:
     """Serve the timing debug HTML page."""
-    if not TIME_LOG_HTML.exists():
+    try:
+        content, _ = _load_template(TIME_LOG_HTML)
+    except OSError:
         raise HTTPException(status_code=404, detail="Timing debug page not found")
-    return HTMLResponse(content=TIME_LOG_HTML.read_text(encoding="utf-8"))
+    return HTMLResponse(content)
 
 
 @router.get("/ui/time_log/data")
@@ -30,6 +30,16 @@ def create_thumbnail(image_bytes: bytes, max_size: tuple[int, int] = (400, 300),
     if img is None:
         return image_bytes
 
+    thumbnail = _encode_thumbnail(cv2, img, max_size, quality)
+    return image_bytes if thumbnail is None else thumbnail
+
+
+def _encode_thumbnail(cv2, img, max_size: tuple[int, int], quality: int) -> bytes | None:
+    """Resize a decoded image and encode it as JPEG.
+
+    Returns None when the image already fits ``max_size`` or encoding fails,
+    so callers can fall back to the full-size bytes.
+    """
     # Calculate thumbnail size maintaining aspect ratio
     h, w = img.shape[:2]
     max_w, max_h = max_size
@@ -38,7 +48,7 @@ def create_thumbnail(image_bytes: bytes, max_size: tuple[int, int] = (400, 300),
     scale = min(max_w / w, max_h / h)
     if scale >= 1.0:
         # Image is already smaller than thumbnail size
-        return image_bytes
+        return None
 
     new_w = int(w * scale)
     new_h = int(h * scale)
@@ -51,7 +61,7 @@ def create_thumbnail(image_bytes: bytes, max_size: tuple[int, int] = (400, 300),
     success, buffer = cv2.imencode('.jpg', thumbnail, encode_params)
 
     if not success:
-        return image_bytes
+        return None
 
     return buffer.tobytes()
 
@@ -124,6 +134,7 @@ class OpenCVCamera:
 
         self._cv2 = cv2
         self._encoding = encoding.lstrip(".") or "jpeg"
+        self._extension = f".{self._encoding}"
         self._source = source
         self._cap = cv2.VideoCapture(source, self._resolve_backend(backend, cv2))
         if not self._cap.isOpened():
@@ -170,15 +181,18 @@ class OpenCVCamera:
         ok, frame = self._cap.read()
         if not ok or frame is None:
             raise RuntimeError("Failed to capture frame from camera")
-        success, buffer = self._cv2.imencode(f".{self._encoding}", frame)
+        success, buffer = self._cv2.imencode(self._extension, frame)
         if not success:
             raise RuntimeError(f"OpenCV failed to encode frame as {self._encoding}")
 
         # Generate full image bytes
         full_image = buffer.tobytes()
 
-        # Generate thumbnail
-        thumbnail = create_thumbnail(full_image, max_size=(400, 300), quality=85)
+        # Generate thumbnail from the raw frame; going through create_thumbnail
+        # would decode the JPEG that was just encoded
+        thumbnail = _encode_thumbnail(self._cv2, frame, (400, 300), 85)
+        if thumbnail is None:
+            thumbnail = full_image
 
         # Timing debug: Record thumbnail complete time
         t1 = time.time() if timing_enabled else None
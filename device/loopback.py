@@ -1,9 +1,10 @@
 from collections import deque
 from dataclasses import dataclass
+import queue
 import time
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TriggerEvent:
     """Represents a single DI trigger event."""
 
@@ -16,22 +17,25 @@ class LoopbackDigitalIO:
     In-memory DI/DO loopback used to exercise the trigger to actuation flow.
     """
 
-    def __init__(self) -> None:
-        self._trigger_events: deque[TriggerEvent] = deque()
-        self._actuation_log: list[tuple[float, bool]] = []
+    def __init__(self, actuation_log_size: int = 4096) -> None:
+        # SimpleQueue blocks in C until put() wakes a waiter, so producers on
+        # other threads need no extra locking
+        self._trigger_events: queue.SimpleQueue[TriggerEvent] = queue.SimpleQueue()
+        # Schedule mode runs indefinitely, so only the newest actuations are kept
+        self._actuation_log: deque[tuple[float, bool]] = deque(
+            maxlen=actuation_log_size
+        )
 
     def inject_trigger(self, label: str = "manual") -> None:
         """Queue a trigger event that ok-trigger can consume."""
-        self._trigger_events.append(TriggerEvent(timestamp=time.time(), label=label))
+        self._trigger_events.put(TriggerEvent(timestamp=time.time(), label=label))
 
     def wait_for_trigger(self, timeout: float = 1.0) -> TriggerEvent | None:
         """Block until a trigger is available or the timeout elapses."""
-        deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            if self._trigger_events:
-                return self._trigger_events.popleft()
-            time.sleep(0.01)
-        return None
+        try:
+            return self._trigger_events.get(timeout=max(timeout, 0.0))
+        except queue.Empty:
+            return None
 
     def actuate(self, state: bool) -> None:
         """Record the requested DO state in the actuation log."""
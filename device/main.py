@@ -1,27 +1,41 @@
 from __future__ import annotations
 
 import argparse
-import json
 import time
 import threading
 import queue
 from pathlib import Path
 import platform
-from typing import Any, Dict, Sequence
+import random
+from typing import TYPE_CHECKING, Any, Dict, Sequence
 
-import requests
-from requests.exceptions import RequestException
+import orjson
 
 from device.actuator import Actuator
 from device.capture import OpenCVCamera, StubCamera
 from device.harness import HarnessConfig, TriggerCaptureActuationHarness
 from device.loopback import LoopbackDigitalIO
 from device.trigger import Trigger
-from cloud.api.client import OkApiHttpClient
-from cloud.api.mock import MockOkApi
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily at runtime
+    import requests
+
+    from cloud.api.client import OkApiHttpClient
+    from cloud.api.mock import MockOkApi
+
+# Anything under cloud.api loads the whole cloud.api package (FastAPI, the
+# inference service), and requests is only needed for HTTP mode, so those
+# imports are deferred until the code paths that use them run.
 
 
 MIN_TRIGGER_INTERVAL_SECONDS = 7.0
+_IS_WINDOWS = platform.system().lower().startswith("win")
+# Handshake event the manual-trigger stream sends when a listener connects
+_CONNECTED_EVENT = b'{"event": "connected"}'
+_STREAM_RETRY_INITIAL = 0.25
+_STREAM_RETRY_MAX = 8.0
+# Queued by the config refresh to wake the schedule loop; not a trigger
+_WAKE = object()
 
 
 def parse_resolution(value: str | None) -> tuple[int, int] | None:
@@ -53,19 +67,25 @@ def start_manual_trigger_listener(
     api_url: str,
     device_id: str,
     timeout: float,
-    out_queue: "queue.Queue[str]",
+    out_queue: "queue.Queue[int | None]",
     stop_event: threading.Event,
     verbose: bool = False,
 ) -> threading.Thread:
     base_url = api_url.rstrip("/")
     stream_url = f"{base_url}/v1/manual-trigger/stream"
 
+    import requests
+    from requests.exceptions import RequestException
+
     def worker() -> None:
         params = {"device_id": device_id}
         headers = {"Accept": "text/event-stream"}
+        # One session per listener so reconnects reuse the pooled connection
+        session = requests.Session()
+        delay = _STREAM_RETRY_INITIAL
         while not stop_event.is_set():
             try:
-                with requests.get(
+                with session.get(
                     stream_url,
                     params=params,
                     headers=headers,
@@ -77,21 +97,33 @@ def start_manual_trigger_listener(
                             print(
                                 f"[device] Manual trigger stream failed: {resp.status_code}"
                             )
-                        time.sleep(1.0)
+                        stop_event.wait(delay)
+                        delay = _next_retry_delay(delay)
                         continue
-                    for line in resp.iter_lines(decode_unicode=True):
+                    delay = _STREAM_RETRY_INITIAL
+                    # Lines stay bytes; only event payloads are decoded
+                    for line in resp.iter_lines():
                         if stop_event.is_set():
                             break
-                        if not line or not line.startswith("data:"):
+                        if not line.startswith(b"data:"):
                             continue
                         payload = line[5:].strip()
-                        if not payload or payload == '{"event": "connected"}':
+                        if not payload or payload == _CONNECTED_EVENT:
+                            continue
+                        # Parsed once here so the schedule loop only sees the
+                        # counter; None means the event carried no counter
+                        try:
+                            counter = orjson.loads(payload).get("counter")
+                            out_queue.put(int(counter) if counter is not None else None)
+                        except (ValueError, TypeError, AttributeError):
                             continue
-                        out_queue.put(payload)
             except RequestException as exc:
                 if verbose:
                     print(f"[device] Manual trigger stream error: {exc}")
-                time.sleep(1.0)
+                # wait() rather than sleep() so shutdown is not held up
+                stop_event.wait(delay)
+                delay = _next_retry_delay(delay)
+        session.close()
         if verbose:
             print("[device] Manual trigger listener stopped")
 
@@ -102,6 +134,12 @@ def start_manual_trigger_listener(
     return thread
 
 
+def _next_retry_delay(delay: float) -> float:
+    # Exponential back-off with jitter so devices that lost the server at the
+    # same moment do not reconnect in lockstep
+    return min(delay * 2, _STREAM_RETRY_MAX) + random.uniform(0.0, 0.1)
+
+
 def build_camera(
     kind: str,
     source: str,
@@ -117,7 +155,7 @@ def build_camera(
 
         backend_to_use = backend
         preferred_attempted = False
-        if backend_to_use is None and platform.system().lower().startswith("win"):
+        if backend_to_use is None and _IS_WINDOWS:
             backend_to_use = "dshow"
             preferred_attempted = True
 
@@ -143,25 +181,46 @@ def build_camera(
 
 def build_api_client(args: argparse.Namespace) -> MockOkApi | OkApiHttpClient:
     if args.api == "http":
+        from cloud.api.client import OkApiHttpClient
+
         return OkApiHttpClient(base_url=args.api_url, timeout=args.api_timeout)
+    from cloud.api.mock import MockOkApi
+
     return MockOkApi(default_state=args.force_state or "normal")
 
 
 def fetch_device_config(
-    api_url: str, device_id: str, timeout: float
-) -> Dict[str, Any] | None:
+    api_url: str,
+    device_id: str,
+    timeout: float,
+    session: "requests.Session | None" = None,
+    cached: tuple[str, Dict[str, Any]] | None = None,
+) -> tuple[Dict[str, Any], str | None] | None:
+    """Return ``(config, etag)``, or None when the fetch fails.
+
+    ``cached`` is the ``(etag, config)`` pair from the previous fetch; when
+    the server answers 304 that config is returned without a download.
+    """
+    import requests
+
     url = f"{api_url.rstrip('/')}/v1/device-config"
+    headers = {"If-None-Match": cached[0]} if cached is not None else None
     try:
-        response = requests.get(
-            url, params={"device_id_override": device_id}, timeout=timeout
+        response = (session or requests).get(
+            url,
+            params={"device_id_override": device_id},
+            headers=headers,
+            timeout=timeout,
         )
+        if response.status_code == 304 and cached is not None:
+            return cached[1], cached[0]
         response.raise_for_status()
     except requests.RequestException as exc:
         print(f"[device] Failed to fetch device config: {exc}")
         return None
     try:
-        return response.json()
-    except ValueError:
+        return orjson.loads(response.content), response.headers.get("ETag")
+    except orjson.JSONDecodeError:
         print("[device] Invalid JSON in device config response")
         return None
 
@@ -254,6 +313,10 @@ def run_schedule(
     api_client: MockOkApi | OkApiHttpClient,
     args: argparse.Namespace,
 ) -> None:
+    import requests
+
+    from cloud.api.mock import MockOkApi
+
     metadata = {"device_id": args.device_id}
     poll_interval = max(1.0, float(args.config_poll_interval))
     manual_refresh_interval = min(poll_interval, 0.5)
@@ -261,13 +324,17 @@ def run_schedule(
     print("[device] Entering scheduled capture mode. Press Ctrl+C to stop.")
 
     config_cache: Dict[str, Any] = {}
+    config_etag: str | None = None
     last_config_refresh = 0.0
     last_manual_refresh = 0.0
     next_capture_at: float | None = None
     last_manual_counter: int | None = None
     pending_manual_captures = 0
 
-    manual_queue: "queue.Queue[str]" = queue.Queue()
+    # Config polls run every half second; keep-alive avoids a new connection
+    # (and TLS handshake) per poll
+    config_session = requests.Session()
+    manual_queue: "queue.Queue[int | None | object]" = queue.Queue()
     stop_event = threading.Event()
     listener_thread = start_manual_trigger_listener(
         api_url=args.api_url,
@@ -278,28 +345,107 @@ def run_schedule(
         verbose=args.verbose,
     )
 
+    def apply_manual_event(counter: int | None | object) -> None:
+        nonlocal pending_manual_captures, last_manual_counter
+        if counter is _WAKE:
+            return
+        if counter is None:
+            pending_manual_captures += 1
+            return
+        if last_manual_counter is None:
+            pending_manual_captures += 1
+        elif counter > last_manual_counter:
+            pending_manual_captures += counter - last_manual_counter
+        elif counter < last_manual_counter:
+            pending_manual_captures += 1
+        last_manual_counter = counter
+
+    # Refreshes after the first run go to one long-lived worker thread while
+    # the loop keeps using the cached config, so a slow API cannot stall
+    # scheduled captures
+    config_updates: "queue.SimpleQueue[tuple[Dict[str, Any], str | None]]" = (
+        queue.SimpleQueue()
+    )
+    # Each request carries the (etag, config) snapshot to revalidate and the
+    # manual counter it holds; None stops the worker
+    refresh_requests: "queue.SimpleQueue[tuple[Any, Any] | None]" = queue.SimpleQueue()
+    refresh_in_flight = threading.Event()
+
+    def config_refresh_worker() -> None:
+        while not stop_event.is_set():
+            request = refresh_requests.get()
+            if request is None:
+                break
+            cached, known_counter = request
+            try:
+                fetched = fetch_device_config(
+                    args.api_url,
+                    args.device_id,
+                    args.api_timeout,
+                    session=config_session,
+                    cached=cached,
+                )
+                if fetched is not None:
+                    config_updates.put(fetched)
+                    if fetched[0].get("manual_trigger_counter") != known_counter:
+                        # Wake idle() so the new trigger fires without
+                        # waiting out the rest of the timeout
+                        manual_queue.put(_WAKE)
+            finally:
+                refresh_in_flight.clear()
+
+    refresh_thread = threading.Thread(
+        target=config_refresh_worker, name="device-config-refresh", daemon=True
+    )
+    refresh_thread.start()
+
+    def refresh_config_in_background() -> None:
+        cached = (config_etag, config_cache) if config_etag else None
+        refresh_in_flight.set()
+        refresh_requests.put((cached, config_cache.get("manual_trigger_counter")))
+
+    def apply_config(fetched: tuple[Dict[str, Any], str | None]) -> None:
+        nonlocal config_cache, config_etag, next_capture_at
+        nonlocal last_manual_counter, pending_manual_captures
+        fresh, etag = fetched
+        # The ETag is a hash of the config body, so comparing tags is enough
+        # when both sides have one; the dict compare covers the rest
+        if etag is not None and config_etag is not None:
+            changed = etag != config_etag
+        else:
+            changed = fresh != config_cache
+        config_etag = etag
+        if changed:
+            if args.verbose:
+                print(f"[device] Received new config: {fresh}")
+            next_capture_at = None
+        config_cache = fresh
+        manual_counter = fresh.get("manual_trigger_counter")
+        if manual_counter is not None:
+            manual_counter = int(manual_counter)
+        if last_manual_counter is None:
+            last_manual_counter = manual_counter
+        elif manual_counter > last_manual_counter:
+            pending_manual_captures += manual_counter - last_manual_counter
+        last_manual_counter = manual_counter
+
+    def idle(timeout: float) -> None:
+        # Waits on the stream queue rather than sleeping, so a manual trigger
+        # wakes the loop immediately instead of after the full timeout
+        try:
+            apply_manual_event(manual_queue.get(timeout=timeout))
+        except queue.Empty:
+            pass
+
     try:
         while True:
             now = time.monotonic()
 
-            while not manual_queue.empty():
-                raw = manual_queue.get()
+            while True:
                 try:
-                    payload = json.loads(raw)
-                except json.JSONDecodeError:
-                    continue
-                counter = payload.get("counter")
-                if counter is None:
-                    pending_manual_captures += 1
-                    continue
-                counter = int(counter)
-                if last_manual_counter is None:
-                    pending_manual_captures += 1
-                elif counter > last_manual_counter:
-                    pending_manual_captures += counter - last_manual_counter
-                elif counter < last_manual_counter:
-                    pending_manual_captures += 1
-                last_manual_counter = counter
+                    apply_manual_event(manual_queue.get_nowait())
+                except queue.Empty:
+                    break
 
             if isinstance(api_client, MockOkApi):
                 config_cache = {
@@ -318,29 +464,29 @@ def run_schedule(
                     or now - last_config_refresh >= poll_interval
                     or now - last_manual_refresh >= manual_refresh_interval
                 )
-                if needs_refresh:
-                    previous_cache = config_cache
-                    fresh = fetch_device_config(
-                        args.api_url, args.device_id, args.api_timeout
-                    )
-                    if fresh is not None:
-                        if fresh != previous_cache and args.verbose:
-                            print(f"[device] Received new config: {fresh}")
-                        config_cache = fresh
-                        if fresh != previous_cache:
-                            next_capture_at = None
-                        manual_counter = fresh.get("manual_trigger_counter")
-                        if manual_counter is not None:
-                            manual_counter = int(manual_counter)
-                        if last_manual_counter is None:
-                            last_manual_counter = manual_counter
-                        elif manual_counter > last_manual_counter:
-                            pending_manual_captures += (
-                                manual_counter - last_manual_counter
-                            )
-                        last_manual_counter = manual_counter
+                while True:
+                    try:
+                        apply_config(config_updates.get_nowait())
+                    except queue.Empty:
+                        break
+                if needs_refresh and not refresh_in_flight.is_set():
+                    bootstrapping = not config_cache
+                    if bootstrapping:
+                        # Nothing cached yet, so the first fetch has to block
+                        fetched = fetch_device_config(
+                            args.api_url,
+                            args.device_id,
+                            args.api_timeout,
+                            session=config_session,
+                        )
+                        if fetched is not None:
+                            apply_config(fetched)
+                        # The fetch may block up to the API timeout
+                        now = time.monotonic()
+                    else:
+                        refresh_config_in_background()
                     last_manual_refresh = now
-                    if not previous_cache or now - last_config_refresh >= poll_interval:
+                    if bootstrapping or now - last_config_refresh >= poll_interval:
                         last_config_refresh = now
 
             trigger_cfg = (config_cache or {}).get("trigger", {})
@@ -367,7 +513,7 @@ def run_schedule(
                 if args.verbose:
                     print(f"[device] Trigger disabled; sleeping for {poll_interval}s")
                 next_capture_at = None
-                time.sleep(manual_refresh_interval)
+                idle(manual_refresh_interval)
                 continue
 
             if next_capture_at is None:
@@ -375,15 +521,17 @@ def run_schedule(
 
             sleep_for = next_capture_at - now
             if sleep_for > 0:
-                time.sleep(min(sleep_for, manual_refresh_interval))
+                idle(min(sleep_for, manual_refresh_interval))
                 continue
 
-            start = time.monotonic()
+            # ``now`` is re-read after the bootstrap fetch, the only blocking
+            # call above, so it doubles as the capture start
+            stamp = int(time.time())
             if manual_pending:
-                label = f"manual-{int(time.time())}-{pending_manual_captures}"
+                label = f"manual-{stamp}-{pending_manual_captures}"
                 pending_manual_captures -= 1
             else:
-                label = f"schedule-{int(time.time())}"
+                label = f"schedule-{stamp}"
             io.inject_trigger(label=label)
             try:
                 event = harness.run_once(metadata=metadata)
@@ -398,24 +546,27 @@ def run_schedule(
                     f"[device] Captured trigger {event.label} at interval {effective_interval:.2f}s"
                 )
 
+            now_after = time.monotonic()
             if pending_manual_captures > 0:
-                next_capture_at = time.monotonic()
+                next_capture_at = now_after
             elif enabled and interval_value is not None:
-                next_capture_at = (next_capture_at or start) + interval_value
-                now_after = time.monotonic()
+                next_capture_at = (next_capture_at or now) + interval_value
                 if next_capture_at <= now_after:
                     drift = now_after - next_capture_at
                     skip = int(drift // interval_value) + 1
                     next_capture_at += skip * interval_value
             else:
                 next_capture_at = None
-                time.sleep(manual_refresh_interval)
+                idle(manual_refresh_interval)
     except KeyboardInterrupt:
         print("[device] Schedule stopped by user")
     finally:
         stop_event.set()
-        if listener_thread.is_alive():
-            listener_thread.join(timeout=2.0)
+        refresh_requests.put(None)
+        for thread in (listener_thread, refresh_thread):
+            if thread.is_alive():
+                thread.join(timeout=2.0)
+        config_session.close()
 
 
 def run_demo(argv: Sequence[str] | None = None) -> None:
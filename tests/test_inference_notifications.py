@@ -4,6 +4,7 @@ import json
 import base64
 from datetime import datetime, timezone
 
+import pytest
 from sendgrid.helpers.mail import Attachment
 
 from cloud.ai.types import Classification
@@ -38,20 +39,28 @@ class SendGridAPIClientStub:
         self.sent_messages.append(message)
 
 
+_IMAGE_BASE64 = base64.b64encode(b"fake-image").decode("ascii")
+
+
 def _build_payload() -> dict[str, object]:
+    # A fresh dict per call so tests never share the mutable metadata dict
     return {
         "device_id": "device-123",
         "trigger_label": "scheduled",
         "metadata": {"extra": "value"},
-        "image_base64": base64.b64encode(b"fake-image").decode("ascii"),
+        "image_base64": _IMAGE_BASE64,
     }
 
 
-def test_notifier_invoked_for_abnormal(tmp_path) -> None:
+@pytest.fixture
+def datalake(tmp_path) -> FileSystemDatalake:
+    return FileSystemDatalake(root=tmp_path)
+
+
+def test_notifier_invoked_for_abnormal(datalake) -> None:
     classifier = _StubClassifier(
         Classification(state="abnormal", score=0.95, reason="anomaly")
     )
-    datalake = FileSystemDatalake(root=tmp_path)
     notifier = _SpyNotifier()
     service = InferenceService(
         classifier=classifier, datalake=datalake, notifier=notifier
@@ -69,9 +78,8 @@ def test_notifier_invoked_for_abnormal(tmp_path) -> None:
     assert record.image_path.exists()
 
 
-def test_notifier_skipped_for_normal(tmp_path) -> None:
+def test_notifier_skipped_for_normal(datalake) -> None:
     classifier = _StubClassifier(Classification(state="normal", score=0.4, reason=None))
-    datalake = FileSystemDatalake(root=tmp_path)
     notifier = _SpyNotifier()
     service = InferenceService(
         classifier=classifier, datalake=datalake, notifier=notifier
@@ -85,9 +93,8 @@ def test_notifier_skipped_for_normal(tmp_path) -> None:
     assert not notifier.records
 
 
-def test_device_timestamp_propagates_to_storage(tmp_path) -> None:
+def test_device_timestamp_propagates_to_storage(tmp_path, datalake) -> None:
     classifier = _StubClassifier(Classification(state="normal", score=0.5, reason=None))
-    datalake = FileSystemDatalake(root=tmp_path)
     service = InferenceService(classifier=classifier, datalake=datalake)
 
     device_time = "2025-10-20T15:30:45+02:00"
@@ -153,8 +160,9 @@ def test_sendgrid_email_includes_image_and_definition(tmp_path) -> None:
 
     classification = record.classification
     sent_at = "2025-09-28T12:34:56Z"
+    subject = service._render_subject(record)  # noqa: SLF001 - exercising helper
     html_preview = service._render_html(  # noqa: SLF001 - exercising helper
-        service._render_subject(record),
+        subject,
         record.metadata,
         classification.get("state"),
         classification.get("score"),
@@ -180,7 +188,7 @@ def test_sendgrid_email_includes_image_and_definition(tmp_path) -> None:
         for att in attachments
     )
     plain_preview = service._render_plain(  # noqa: SLF001 - exercising helper
-        service._render_subject(record),
+        subject,
         record.metadata,
         classification.get("state"),
         classification.get("score"),
@@ -194,11 +202,10 @@ def test_sendgrid_email_includes_image_and_definition(tmp_path) -> None:
     assert plain_payload.get("capture_url") == "http://localhost:8000/ui"
 
 
-def test_alert_cooldown_blocks_until_reset(tmp_path) -> None:
+def test_alert_cooldown_blocks_until_reset(datalake) -> None:
     classifier = _StubClassifier(
         Classification(state="abnormal", score=0.95, reason="alert")
     )
-    datalake = FileSystemDatalake(root=tmp_path)
     notifier = _SpyNotifier()
     service = InferenceService(
         classifier=classifier, datalake=datalake, notifier=notifier
@@ -222,9 +229,8 @@ def test_alert_cooldown_blocks_until_reset(tmp_path) -> None:
     assert len(notifier.records) == 2
 
 
-def test_dedupe_skips_repeated_states(tmp_path) -> None:
+def test_dedupe_skips_repeated_states(tmp_path, datalake) -> None:
     classifier = _StubClassifier(Classification(state="normal", score=1.0, reason=None))
-    datalake = FileSystemDatalake(root=tmp_path)
     service = InferenceService(classifier=classifier, datalake=datalake)
     service.update_dedupe_settings(True, threshold=2, keep_every=3)
 
@@ -243,9 +249,8 @@ def test_dedupe_skips_repeated_states(tmp_path) -> None:
     assert created_flags == [True, True, True, False, False, True]
 
 
-def test_dedupe_resets_on_state_change(tmp_path) -> None:
+def test_dedupe_resets_on_state_change(tmp_path, datalake) -> None:
     classifier = _StubClassifier(Classification(state="normal", score=1.0, reason=None))
-    datalake = FileSystemDatalake(root=tmp_path)
     service = InferenceService(classifier=classifier, datalake=datalake)
     service.update_dedupe_settings(True, threshold=1, keep_every=3)
 
@@ -267,9 +272,8 @@ def test_dedupe_resets_on_state_change(tmp_path) -> None:
     assert len(json_files) == 3
 
 
-def test_streak_pruning_stores_metadata_only(tmp_path) -> None:
+def test_streak_pruning_stores_metadata_only(tmp_path, datalake) -> None:
     classifier = _StubClassifier(Classification(state="normal", score=0.8, reason=None))
-    datalake = FileSystemDatalake(root=tmp_path)
     service = InferenceService(
         classifier=classifier,
         datalake=datalake,
@@ -293,9 +297,8 @@ def test_streak_pruning_stores_metadata_only(tmp_path) -> None:
     assert len(image_files) == 3
 
 
-def test_streak_reset_on_state_change(tmp_path) -> None:
+def test_streak_reset_on_state_change(tmp_path, datalake) -> None:
     classifier = _StubClassifier(Classification(state="normal", score=0.9, reason=None))
-    datalake = FileSystemDatalake(root=tmp_path)
     service = InferenceService(
         classifier=classifier,
         datalake=datalake,
@@ -324,3 +327,27 @@ def test_streak_reset_on_state_change(tmp_path) -> None:
     else:
         image_file = metadata_file.with_suffix(".jpeg")
     assert image_file.exists()
+
+
+def test_async_datalake_writes_abnormal_image_before_notifying(tmp_path) -> None:
+    classifier = _StubClassifier(
+        Classification(state="abnormal", score=0.95, reason="anomaly")
+    )
+    datalake = FileSystemDatalake(root=tmp_path, async_writes=True, write_queue_size=4)
+    notifier = _SpyNotifier()
+    service = InferenceService(
+        classifier=classifier, datalake=datalake, notifier=notifier
+    )
+
+    try:
+        service.process_capture(_build_payload())
+        assert notifier.records[0].image_path.exists()
+
+        classifier._classification = Classification(state="normal", score=0.1, reason=None)
+        result = service.process_capture(_build_payload())
+        datalake.flush()
+    finally:
+        datalake.close()
+
+    metadata_file = next(tmp_path.glob(f"**/{result['record_id']}.json"))
+    assert metadata_file.with_suffix(".jpeg").exists()
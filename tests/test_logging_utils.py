@@ -10,14 +10,15 @@ def test_startup_buffer_writes_file(tmp_path) -> None:
         output_dir=tmp_path, window_seconds=5.0, capacity=10
     )
     handler.setFormatter(logging.Formatter("%(levelname)s:%(message)s"))
+    handler.setLevel(logging.INFO)
 
     test_logger = logging.getLogger("okmonitor.test.startup")
     original_level = test_logger.level
     test_logger.setLevel(logging.INFO)
 
+    # Propagation ignores the root logger's own level, so the root only needs
+    # the handler; leaving its level alone keeps logger caches intact
     root = logging.getLogger()
-    original_root_level = root.level
-    root.setLevel(logging.DEBUG)
     root.addHandler(handler)
     try:
         test_logger.info("boot sequence")
@@ -25,7 +26,6 @@ def test_startup_buffer_writes_file(tmp_path) -> None:
         handler.flush()
     finally:
         root.removeHandler(handler)
-        root.setLevel(original_root_level)
         handler.close()
         test_logger.setLevel(original_level)
 
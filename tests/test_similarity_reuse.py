@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import base64
+import functools
 import io
 from datetime import datetime, timezone, timedelta
 
@@ -8,10 +9,11 @@ from PIL import Image
 
 from cloud.ai.types import Classification
 from cloud.api.service import InferenceService
-from cloud.api.similarity_cache import SimilarityCache
+from cloud.api.similarity_cache import SimilarityCache, hamming_distances
 from cloud.datalake.storage import FileSystemDatalake
 
 
+@functools.lru_cache(maxsize=8)
 def _encode_image(color: str) -> str:
     img = Image.new("RGB", (48, 48), color=color)
     buf = io.BytesIO()
@@ -84,3 +86,66 @@ def test_similarity_cache_expires_entries(tmp_path) -> None:
     )
     cache.prune_expired(60)
     assert cache.get("device-a") is None
+
+
+def test_similarity_hash_skipped_until_streak_can_reach_threshold(tmp_path) -> None:
+    classifier = _CountingClassifier()
+    service = InferenceService(
+        classifier=classifier,
+        datalake=FileSystemDatalake(root=tmp_path / "datalake"),
+        similarity_enabled=True,
+        similarity_threshold=0,
+        similarity_cache=SimilarityCache(tmp_path / "cache.json"),
+        streak_pruning_enabled=True,
+        streak_threshold=3,
+    )
+    hashed: list[bytes] = []
+    original = service._compute_similarity_hash
+
+    def _spy(image_bytes: bytes) -> str | None:
+        hashed.append(image_bytes)
+        return original(image_bytes)
+
+    service._compute_similarity_hash = _spy  # type: ignore[method-assign]
+
+    image_b64 = _encode_image("blue")
+    for _ in range(4):
+        service.process_capture(_build_payload(image_b64))
+
+    # Captures 1-2 cannot reach the streak threshold, capture 3 seeds the
+    # cache and capture 4 reuses it.
+    assert len(hashed) == 2
+    assert classifier.calls == 3
+
+
+def test_hamming_distances_matches_bit_count() -> None:
+    target = 0xF0F0_F0F0_F0F0_F0F0
+    candidates = [target, 0, 0xFFFF_FFFF_FFFF_FFFF, target ^ 0b1011]
+
+    distances = hamming_distances(target, candidates)
+
+    assert distances.tolist() == [(target ^ c).bit_count() for c in candidates]
+    assert hamming_distances(target, []).size == 0
+
+
+def test_similarity_cache_scans_older_entries_in_bucket(tmp_path) -> None:
+    cache = SimilarityCache(tmp_path / "cache.json")
+    scene_a = 0x8000_0000_0000_00FF
+    scene_b = 0x1000_0000_0000_FF00
+    for record_id, hash_value in (("a", scene_a), ("b", scene_b)):
+        cache.update(
+            device_id="device-a",
+            record_id=record_id,
+            hash_hex=f"{hash_value:016x}",
+            state="normal",
+            score=0.9,
+            reason=None,
+        )
+
+    candidates = cache.get_candidates("device-a", scene_a ^ 0b1)
+
+    assert {entry.record_id for entry in candidates} == {"a", "b"}
+    cache.flush()
+    reloaded = SimilarityCache(tmp_path / "cache.json")
+    assert reloaded.get("device-a").record_id == "b"
+    assert [e.record_id for e in reloaded.get_candidates("device-a", scene_a)][0] == "a"
@@ -1,6 +1,12 @@
+import base64
+import io
 import json
+import os
 import tempfile
+import threading
 import unittest
+from datetime import datetime
+from unittest.mock import patch
 from pathlib import Path
 
 from fastapi.testclient import TestClient
@@ -10,7 +16,10 @@ from cloud.ai.consensus import ConsensusClassifier
 from cloud.ai.types import Classification, Classifier
 from cloud.api.notification_settings import NotificationSettings
 from cloud.api.server import create_app
+from cloud.datalake import storage as storage_module
+from cloud.web.capture_utils import scan_capture_day
 from cloud.web.preferences import UIPreferences
+from cloud.web.routes import TEMPLATE_RELOAD_ENV
 
 
 class _DummyClassifier(Classifier):
@@ -125,6 +134,21 @@ class UiRoutesTests(unittest.TestCase):
             self.assertIsNotNone(status["last_seen"])
             self.assertTrue(status["ip"])
 
+    def test_device_config_answers_matching_etag_with_304(self) -> None:
+        app = create_app(
+            root_dir=self.tmp_path / "datalake_etag",
+            normal_description="Initial",
+            normal_description_path=self.tmp_path / "normal_etag.txt",
+        )
+
+        with TestClient(app) as client:
+            first = client.get("/v1/device-config")
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers["ETag"]
+            repeat = client.get("/v1/device-config", headers={"If-None-Match": etag})
+            self.assertEqual(repeat.status_code, 304)
+            self.assertEqual(repeat.content, b"")
+
     def test_capture_listing_and_trigger_controls(self) -> None:
         datalake_dir = self.tmp_path / "datalake"
         app = create_app(
@@ -226,6 +250,122 @@ class UiRoutesTests(unittest.TestCase):
             )
             self.assertGreaterEqual(config_payload["manual_trigger_counter"], 1)
 
+    def test_ui_page_revalidates_with_etag(self) -> None:
+        template = self.tmp_path / "index.html"
+        template.write_text("<html>v1</html>", encoding="utf-8")
+        app = create_app(
+            root_dir=self.tmp_path / "datalake_ui_etag",
+            normal_description="",
+            normal_description_path=self.tmp_path / "normal_ui_etag.txt",
+        )
+
+        with patch("cloud.web.routes.INDEX_HTML", template), patch.dict(
+            os.environ, {TEMPLATE_RELOAD_ENV: "1"}
+        ), TestClient(app) as client:
+            first = client.get("/ui")
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(first.text, "<html>v1</html>")
+            etag = first.headers["etag"]
+
+            repeat = client.get("/ui", headers={"If-None-Match": etag})
+            self.assertEqual(repeat.status_code, 304)
+            self.assertEqual(repeat.content, b"")
+
+            template.write_text("<html>v2</html>", encoding="utf-8")
+            changed = client.get("/ui", headers={"If-None-Match": etag})
+            self.assertEqual(changed.status_code, 200)
+            self.assertEqual(changed.text, "<html>v2</html>")
+            self.assertNotEqual(changed.headers["etag"], etag)
+
+    def test_capture_image_caching_headers(self) -> None:
+        app = create_app(
+            root_dir=self.tmp_path / "datalake_image_cache",
+            normal_description="",
+            normal_description_path=self.tmp_path / "normal_image_cache.txt",
+        )
+        record = app.state.datalake.store_capture(
+            image_bytes=b"jpeg-bytes",
+            metadata={"trigger_label": "cache-test"},
+            classification={"state": "normal", "score": 0.5, "reason": None},
+            device_id="ui-device",
+        )
+        url = f"/ui/captures/{record.record_id}/image"
+
+        with TestClient(app) as client:
+            first = client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(first.content, b"jpeg-bytes")
+            etag = first.headers.get("etag")
+            self.assertTrue(etag)
+            self.assertIn("immutable", first.headers["cache-control"])
+
+            revalidated = client.get(url, headers={"If-None-Match": etag})
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated.content, b"")
+            self.assertEqual(revalidated.headers["etag"], etag)
+
+            stale = client.get(url, headers={"If-None-Match": '"other"'})
+            self.assertEqual(stale.status_code, 200)
+
+            head = client.head(url)
+            self.assertEqual(head.status_code, 200)
+            self.assertEqual(head.content, b"")
+            self.assertEqual(head.headers["content-length"], str(len(b"jpeg-bytes")))
+            self.assertEqual(head.headers["etag"], etag)
+
+    def test_async_ingest_serves_image_before_write_lands(self) -> None:
+        app = create_app(
+            root_dir=self.tmp_path / "datalake_async",
+            classifier=_DummyClassifier(),
+            normal_description="",
+            normal_description_path=self.tmp_path / "normal_async.txt",
+            datalake_async_writes=True,
+        )
+        buffer = io.BytesIO()
+        Image.new("RGB", (48, 48), color="purple").save(buffer, format="JPEG")
+        image_bytes = buffer.getvalue()
+
+        # Hold the background writer so the capture is still queued when the
+        # UI asks for it
+        release = threading.Event()
+        original_write = storage_module._write_file
+
+        def gated_write(path: Path, data: bytes) -> None:
+            if threading.current_thread().name == "datalake-writer":
+                release.wait(timeout=5)
+            original_write(path, data)
+
+        with patch.object(storage_module, "_write_file", gated_write), TestClient(
+            app
+        ) as client:
+            try:
+                ingest = client.post(
+                    "/v1/captures",
+                    json={
+                        "device_id": "ui-device",
+                        "trigger_label": "async-test",
+                        "image_base64": base64.b64encode(image_bytes).decode("ascii"),
+                    },
+                )
+                self.assertEqual(ingest.status_code, 200)
+                record_id = ingest.json()["record_id"]
+
+                listed = client.get("/ui/captures").json()
+                self.assertEqual(listed[0]["record_id"], record_id)
+                self.assertTrue(listed[0]["image_available"])
+
+                pending = client.get(f"/ui/captures/{record_id}/image")
+                self.assertEqual(pending.status_code, 200)
+                self.assertEqual(pending.content, image_bytes)
+            finally:
+                release.set()
+            app.state.datalake.flush()
+
+            written = client.get(f"/ui/captures/{record_id}/image")
+            self.assertEqual(written.status_code, 200)
+            self.assertEqual(written.content, image_bytes)
+            self.assertTrue(written.headers.get("etag"))
+
     def test_normal_definition_lookup_validation(self) -> None:
         app = create_app(
             root_dir=self.tmp_path / "datalake_lookup",
@@ -233,10 +373,26 @@ class UiRoutesTests(unittest.TestCase):
             normal_description_path=self.tmp_path / "lookup_seed.txt",
         )
 
+        store_dir = Path(app.state.normal_description_store_dir)
+        store_dir.mkdir(parents=True, exist_ok=True)
+        (store_dir / "plain.txt").write_text("Plain definition", encoding="utf-8")
+
         with TestClient(app) as client:
             missing = client.get("/ui/normal-definitions/missing.txt")
             self.assertEqual(missing.status_code, 404)
 
+            plain = client.get("/ui/normal-definitions/plain.txt")
+            self.assertEqual(plain.status_code, 200)
+            self.assertEqual(plain.json()["description"], "Plain definition")
+
+            # Percent-encoded so the client sends the names verbatim instead
+            # of normalising the dot segments away
+            for name in ("%2E%2E", "..%2F..", "..%5Cplain.txt", "plain%00.txt"):
+                with self.subTest(name=name):
+                    response = client.get(f"/ui/normal-definitions/{name}")
+                    self.assertIn(response.status_code, (400, 404))
+                    self.assertNotIn("Plain definition", response.text)
+
     def test_ui_preferences_roundtrip(self) -> None:
         app = create_app(
             root_dir=self.tmp_path / "datalake_prefs",
@@ -350,6 +506,179 @@ class UiRoutesTests(unittest.TestCase):
             )
             self.assertEqual(response.status_code, 400)
 
+    def test_capture_filters_walk_partitions_newest_first(self) -> None:
+        app = create_app(
+            root_dir=self.tmp_path / "datalake_partitions",
+            normal_description="",
+            normal_description_path=self.tmp_path / "normal_partitions.txt",
+        )
+        datalake = app.state.datalake
+        stored = []
+        for device_id, captured_at in (
+            ("zeta-device", "2025-01-30T08:00:00+00:00"),
+            ("alpha-device", "2025-02-01T09:00:00+00:00"),
+            ("zeta-device", "2025-02-01T07:00:00+00:00"),
+            ("alpha-device", "2024-12-31T23:00:00+00:00"),
+        ):
+            stored.append(
+                datalake.store_capture(
+                    image_bytes=b"jpeg",
+                    metadata={"trigger_label": "partition-test"},
+                    classification={"state": "normal", "score": 0.5, "reason": None},
+                    captured_at=datetime.fromisoformat(captured_at),
+                    device_id=device_id,
+                )
+            )
+
+        with TestClient(app) as client:
+            latest_two = client.get(
+                "/ui/captures", params={"limit": 2, "state": "normal"}
+            ).json()
+            self.assertEqual(
+                [item["record_id"] for item in latest_two],
+                [stored[1].record_id, stored[2].record_id],
+            )
+
+            windowed = client.get(
+                "/ui/captures",
+                params={
+                    "from": "2024-12-31T00:00:00Z",
+                    "to": "2025-01-31T00:00:00Z",
+                },
+            ).json()
+            self.assertEqual(
+                [item["record_id"] for item in windowed],
+                [stored[0].record_id, stored[3].record_id],
+            )
+
+    def test_day_scan_cache_follows_directory_mtime(self) -> None:
+        day_dir = self.tmp_path / "scan_cache" / "2025" / "01" / "02"
+        day_dir.mkdir(parents=True)
+        first = "cam_20250102T080000000000Z_aaaaaaaa.json"
+        (day_dir / first).write_text("{}", encoding="utf-8")
+        os.utime(day_dir, ns=(1_000_000_000, 1_000_000_000))
+        self.assertEqual(scan_capture_day(day_dir)[0], [first])
+
+        # A file added without a directory mtime change stays hidden (cached)
+        second = "cam_20250102T090000000000Z_bbbbbbbb.json"
+        (day_dir / second).write_text("{}", encoding="utf-8")
+        os.utime(day_dir, ns=(1_000_000_000, 1_000_000_000))
+        self.assertEqual(scan_capture_day(day_dir)[0], [first])
+
+        os.utime(day_dir, ns=(2_000_000_000, 2_000_000_000))
+        self.assertEqual(scan_capture_day(day_dir)[0], [second, first])
+
+    def test_filtered_captures_served_from_index(self) -> None:
+        app = create_app(
+            root_dir=self.tmp_path / "datalake_index",
+            normal_description="",
+            normal_description_path=self.tmp_path / "normal_index.txt",
+        )
+        datalake = app.state.datalake
+        records = []
+        for state in ("abnormal", "normal", "abnormal"):
+            record = datalake.store_capture(
+                image_bytes=b"jpeg",
+                metadata={"trigger_label": "index-test"},
+                classification={"state": state, "score": 0.5, "reason": None},
+                device_id="ui-device",
+            )
+            app.state.capture_index.add_record(record)
+            records.append(record)
+
+        # A partition scan would fail the request, proving the ring answered
+        with patch(
+            "cloud.web.routes._collect_recent_captures",
+            side_effect=AssertionError("unexpected disk walk"),
+        ), TestClient(app) as client:
+            payload = client.get(
+                "/ui/captures", params={"limit": 2, "state": "abnormal"}
+            ).json()
+            image_resp = client.get(f"/ui/captures/{records[1].record_id}/image")
+
+        self.assertEqual(
+            [item["record_id"] for item in payload],
+            [records[2].record_id, records[0].record_id],
+        )
+        self.assertEqual(image_resp.status_code, 200)
+        self.assertEqual(image_resp.content, b"jpeg")
+
+    def test_index_drops_deleted_captures_and_falls_back_to_disk(self) -> None:
+        app = create_app(
+            root_dir=self.tmp_path / "datalake_index_stale",
+            normal_description="",
+            normal_description_path=self.tmp_path / "normal_index_stale.txt",
+        )
+        datalake = app.state.datalake
+        capture_index = app.state.capture_index
+        # Written by "another process": on disk but never added to the ring
+        external = datalake.store_capture(
+            image_bytes=b"jpeg",
+            metadata={"trigger_label": "external"},
+            classification={"state": "abnormal", "score": 0.5, "reason": None},
+            captured_at=datetime.fromisoformat("2025-01-01T08:00:00+00:00"),
+            device_id="ui-device",
+        )
+        records = []
+        for state in ("abnormal", "normal", "abnormal"):
+            record = datalake.store_capture(
+                image_bytes=b"jpeg",
+                metadata={"trigger_label": "index-test"},
+                classification={"state": state, "score": 0.5, "reason": None},
+                device_id="ui-device",
+            )
+            capture_index.add_record(record)
+            records.append(record)
+        records[2].metadata_path.unlink()
+        records[2].image_path.unlink()
+        records[0].image_path.unlink()  # pruned image, metadata kept
+
+        with TestClient(app) as client:
+            payload = client.get(
+                "/ui/captures", params={"limit": 2, "state": "abnormal"}
+            ).json()
+
+        self.assertEqual(
+            [item["record_id"] for item in payload],
+            [records[0].record_id, external.record_id],
+        )
+        self.assertFalse(payload[0]["image_available"])
+        self.assertTrue(payload[1]["image_available"])
+        self.assertIsNone(capture_index.get(records[2].record_id))
+
+    def test_capture_listing_finds_image_named_by_metadata(self) -> None:
+        app = create_app(
+            root_dir=self.tmp_path / "datalake_legacy",
+            normal_description="",
+            normal_description_path=self.tmp_path / "normal_legacy.txt",
+        )
+        record = app.state.datalake.store_capture(
+            image_bytes=b"jpeg",
+            metadata={"trigger_label": "legacy"},
+            classification={"state": "normal", "score": 0.5, "reason": None},
+            device_id="ui-device",
+        )
+        # Legacy and externally written records may name an image whose stem
+        # differs from the metadata file's
+        legacy_image = record.image_path.with_name("legacy_photo.jpeg")
+        record.image_path.rename(legacy_image)
+        payload = json.loads(record.metadata_path.read_text(encoding="utf-8"))
+        payload["image_filename"] = legacy_image.name
+        record.metadata_path.write_text(json.dumps(payload), encoding="utf-8")
+
+        with TestClient(app) as client:
+            for _ in range(2):  # the second listing comes from the summary cache
+                listed = client.get("/ui/captures", params={"state": "normal"}).json()
+                self.assertEqual(len(listed), 1)
+                self.assertTrue(listed[0]["image_available"])
+            image_resp = client.get(f"/ui/captures/{record.record_id}/image")
+            self.assertEqual(image_resp.status_code, 200)
+            self.assertEqual(image_resp.content, b"jpeg")
+
+            legacy_image.unlink()
+            pruned = client.get("/ui/captures", params={"state": "normal"}).json()
+            self.assertFalse(pruned[0]["image_available"])
+
 
 if __name__ == "__main__":
     unittest.main()